@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import glob
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import puz
+
+
+def _synthetic_corpus(outdir: str, files: int) -> list[str]:
+    # copies of the sample puzzles, including the deliberately broken ones,
+    # so that error reporting is part of what gets measured
+    sources = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testfiles', '*.puz')))
+    filenames = []
+    for i in range(files):
+        src = sources[i % len(sources)]
+        dst = os.path.join(outdir, f'{i:06d}_{os.path.basename(src)}')
+        shutil.copyfile(src, dst)
+        filenames.append(dst)
+    return filenames
+
+
+def bench_load_many(files: int, workers: list[int], chunksize: int) -> None:
+    with tempfile.TemporaryDirectory() as outdir:
+        filenames = _synthetic_corpus(outdir, files)
+
+        start = time.perf_counter()
+        for filename in filenames:
+            with contextlib.suppress(puz.PuzzleFormatError):
+                puz.read(filename)
+        baseline = time.perf_counter() - start
+        print(f'{files} files, chunksize {chunksize}')
+        print(f'{"read loop":>12}: {baseline:8.3f}s')
+
+        for n in workers:
+            start = time.perf_counter()
+            errors = sum(isinstance(result, puz.PuzzleFormatError)
+                         for _, result in puz.load_many(filenames, workers=n, chunksize=chunksize))
+            elapsed = time.perf_counter() - start
+            print(f'{f"workers={n}":>12}: {elapsed:8.3f}s  speedup {baseline / elapsed:5.2f}x  ({errors} errors)')
+
+
+def legacy_grid_numbering(grid: str, width: int, height: int) -> tuple[list[puz.ClueEntry], list[puz.ClueEntry]]:
+    # get_grid_numbering as it was before the linear-time rewrite, for comparison
+    def col(index: int) -> int:
+        return index % width
+
+    def row(index: int) -> int:
+        return index // width
+
+    def len_across(index: int) -> int:
+        c = 0
+        for c in range(width - col(index)):
+            if puz.is_blacksquare(grid[index + c]):
+                return c
+        return c + 1
+
+    def len_down(index: int) -> int:
+        c = 0
+        for c in range(height - row(index)):
+            if puz.is_blacksquare(grid[index + c*width]):
+                return c
+        return c + 1
+
+    across: list[puz.ClueEntry] = []
+    down: list[puz.ClueEntry] = []
+    count = 0  # count is the index into the clues list; 0-based and counts across and down together
+    num = 1  # num is the clue number that gets printed in the grid
+    for i in range(len(grid)):  # i is the cell index in row-major order
+        if not puz.is_blacksquare(grid[i]):
+            lastc = count
+            is_across = col(i) == 0 or puz.is_blacksquare(grid[i - 1])
+            if is_across and len_across(i) > 1:
+                across.append(puz.ClueEntry({
+                    'num': num,
+                    'clue': None,  # filled in by caller
+                    'clue_index': count,
+                    'cell': i,
+                    'row': row(i),
+                    'col': col(i),
+                    'len': len_across(i),
+                    'dir': 'across',
+                }))
+                count += 1
+            is_down = row(i) == 0 or puz.is_blacksquare(grid[i - width])
+            if is_down and len_down(i) > 1:
+                down.append(puz.ClueEntry({
+                    'num': num,
+                    'clue': None,  # filled in by caller
+                    'clue_index': count,
+                    'cell': i,
+                    'row': row(i),
+                    'col': col(i),
+                    'len': len_down(i),
+                    'dir': 'down'
+                }))
+                count += 1
+            if count > lastc:
+                num += 1
+
+    return across, down
+
+
+def _random_grid(size: int, rng: random.Random) -> str:
+    # a symmetric grid with roughly one black square in six
+    cells = ['A'] * (size * size)
+    for i in range(len(cells) // 2 + 1):
+        if rng.random() < 1 / 6:
+            cells[i] = cells[-1 - i] = '.'
+    return ''.join(cells)
+
+
+def bench_numbering(sizes: list[int], grids: int) -> None:
+    rng = random.Random(0)
+    for size in sizes:
+        samples = [_random_grid(size, rng) for _ in range(grids)]
+        puz.set_numbering_cache_size(0)
+        timings = {}
+        for name, numbering in (('legacy', legacy_grid_numbering), ('current', puz.get_grid_numbering),
+                                ('cached', puz.get_grid_numbering)):
+            if name == 'cached':
+                # numbering grid patterns that have been seen before
+                puz.set_numbering_cache_size(grids)
+                for grid in samples:
+                    numbering(grid, size, size)
+            start = time.perf_counter()
+            for grid in samples:
+                numbering(grid, size, size)
+            timings[name] = (time.perf_counter() - start) / grids
+        speedups = ', '.join(f'{timings["legacy"] / timings[name]:.2f}x {name}' for name in ('current', 'cached'))
+        print(f'{size:>3}x{size:<3}  ' + '  '.join(f'{name} {t * 1e3:8.3f}ms' for name, t in timings.items()) +
+              f'  speedup {speedups}')
+
+
+def _allocated(build: Callable[[], object]) -> int:
+    # bytes still allocated by build() once it returns, i.e. the size of what it built
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def bench_clue_memory(copies: int) -> None:
+    sources = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testfiles', '*.puz')))
+    puzzles = []
+    for filename in sources:
+        with contextlib.suppress(puz.PuzzleFormatError):
+            puzzles.append(puz.read(filename))
+    puzzles *= copies
+    for p in puzzles:
+        p.clue_table()  # fill the numbering cache, which both representations share
+
+    numbering = _allocated(lambda: [puz.ClueNumbering(p) for p in puzzles])
+    table = _allocated(lambda: [p.clue_table() for p in puzzles])
+    entries = sum(len(p.clue_table()) for p in puzzles)
+    print(f'{len(puzzles)} puzzles, {entries} entries')
+    for name, size in (('ClueNumbering', numbering), ('ClueTable', table)):
+        print(f'{name:>13}: {size / len(puzzles):10.0f} bytes/puzzle  {size / entries:6.1f} bytes/entry')
+    print(f'{"saved":>13}: {(numbering - table) / len(puzzles):10.0f} bytes/puzzle  ({numbering / table:.1f}x smaller)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks for puz.py")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    load_many = subparsers.add_parser('load_many', help="Scaling of puz.load_many with worker count")
+    load_many.add_argument(
+        '--files', type=int, default=4000,
+        help="Number of files in the synthetic corpus (default: 4000)"
+    )
+    load_many.add_argument(
+        '--workers', type=int, nargs='+',
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+        help="Worker counts to measure (default: 1 2 4 and the number of CPUs)"
+    )
+    load_many.add_argument(
+        '--chunksize', type=int, default=16,
+        help="Files per task sent to a worker (default: 16)"
+    )
+
+    numbering = subparsers.add_parser('numbering', help="get_grid_numbering against the previous implementation")
+    numbering.add_argument(
+        '--sizes', type=int, nargs='+', default=[15, 21, 50, 255],
+        help="Grid sizes to measure (default: 15 21 50 255)"
+    )
+    numbering.add_argument(
+        '--grids', type=int, default=20,
+        help="Random grids per size (default: 20)"
+    )
+
+    clue_memory = subparsers.add_parser('clue_memory', help="Memory held by ClueNumbering against ClueTable")
+    clue_memory.add_argument(
+        '--copies', type=int, default=100,
+        help="Copies of the sample puzzles to number (default: 100)"
+    )
+
+    args = parser.parse_args()
+    if args.benchmark == 'load_many':
+        bench_load_many(args.files, args.workers, args.chunksize)
+    elif args.benchmark == 'numbering':
+        bench_numbering(args.sizes, args.grids)
+    elif args.benchmark == 'clue_memory':
+        bench_clue_memory(args.copies)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,24 @@
 ﻿from __future__ import annotations  # for Python 3.9 and earlier
 
+import array
+import asyncio
+import bisect
+import concurrent.futures
+import contextlib
+import functools
+import importlib
 import importlib.metadata
+import itertools
+import mmap
+import operator
+import os
+import re
+import shutil
 import string
 import struct
-from collections.abc import Iterable, Iterator
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Mapping, MutableMapping, Sequence
 from enum import Enum, IntEnum
-from typing import Any, Protocol, cast, runtime_checkable
+from typing import Any, BinaryIO, NamedTuple, Protocol, cast, overload, runtime_checkable
 
 __version__ = importlib.metadata.version('puzpy')
 
@@ -130,21 +143,131 @@ class ClueEntry(dict[str, Any]):
     @property
     def solution(self) -> str:
         assert self._puzzle is not None, 'ClueEntry has no puzzle reference'
-        return Grid(self._puzzle.solution, self._puzzle.width, self._puzzle.height).get_string_for_clue(self)
+        return self._puzzle.solution_grid().get_string_for_clue(self)
 
     @property
     def fill(self) -> str:
         assert self._puzzle is not None, 'ClueEntry has no puzzle reference'
-        return Grid(self._puzzle.fill, self._puzzle.width, self._puzzle.height).get_string_for_clue(self)
+        return self._puzzle.grid().get_string_for_clue(self)
 
 
-def read(filename: str) -> Puzzle:
+def read(filename: str, lazy: bool = False) -> Puzzle:
     """
     Read a .puz file and return the Puzzle object.
+    If lazy is True, extension sections are decoded on first access (see Puzzle.load).
     raises PuzzleFormatError if there's any problem with the file format.
     """
     with open(filename, 'rb') as f:
-        return load(f.read())
+        return load(f.read(), lazy=lazy)
+
+
+def read_mmap(filename: str) -> Puzzle:
+    """
+    Read a .puz file through a read-only memory map and return the Puzzle object.
+    The file is parsed straight from the mapping rather than being read into memory
+    first, which helps with files that carry large preambles or postscripts and when
+    scanning many files. The mapping is closed once the puzzle has been decoded.
+    raises PuzzleFormatError if there's any problem with the file format.
+    """
+    with open(filename, 'rb') as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return load(b'')
+        with mapping:
+            return load(mapping)
+
+
+def load_many(filenames: Iterable[str], workers: int | None = None, chunksize: int = 16,
+              ordered: bool = True) -> Iterator[tuple[str, Puzzle | PuzzleFormatError]]:
+    """
+    Read many .puz files using a pool of worker processes. Yields a (filename, result)
+    pair per file, where result is either the Puzzle or the PuzzleFormatError raised
+    while reading it, so that one bad file doesn't abort the batch. Other errors, such
+    as a missing file, are raised as usual.
+    Results are yielded in input order, or as soon as each chunk of chunksize files
+    completes if ordered is False. workers defaults to the number of CPUs; with a
+    single worker the files are read in this process.
+    """
+    filenames = list(filenames)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for filename in filenames:
+            yield filename, _read_or_error(filename)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            if ordered:
+                yield from zip(filenames, executor.map(_read_or_error, filenames, chunksize=chunksize))
+            else:
+                chunks = [filenames[i:i + chunksize] for i in range(0, len(filenames), chunksize)]
+                futures = [executor.submit(_read_chunk, chunk) for chunk in chunks]
+                for future in concurrent.futures.as_completed(futures):
+                    yield from future.result()
+        finally:
+            # if the caller stops iterating early, don't wait for the rest of the files to be read
+            executor.shutdown(cancel_futures=True)
+
+
+def _read_or_error(filename: str) -> Puzzle | PuzzleFormatError:
+    try:
+        return read(filename)
+    except PuzzleFormatError as e:
+        return e
+
+
+def _read_chunk(filenames: list[str]) -> list[tuple[str, Puzzle | PuzzleFormatError]]:
+    return [(filename, _read_or_error(filename)) for filename in filenames]
+
+
+async def aread(filename: str, lazy: bool = False, executor: concurrent.futures.Executor | None = None) -> Puzzle:
+    """
+    Read a .puz file without blocking the event loop and return the Puzzle object.
+    The file is read and decoded on executor (the loop's default executor if None).
+    raises PuzzleFormatError if there's any problem with the file format.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(read, filename, lazy=lazy))
+
+
+async def aread_many(filenames: Iterable[str], limit: int = 8, ordered: bool = True,
+                     executor: concurrent.futures.Executor | None = None,
+                     ) -> AsyncIterator[tuple[str, Puzzle | PuzzleFormatError]]:
+    """
+    Asynchronous counterpart to load_many: read many .puz files on executor with at most
+    limit files in flight, yielding a (filename, result) pair per file where result is the
+    Puzzle or the PuzzleFormatError raised while reading it. Results are yielded in input
+    order, or as each file completes if ordered is False.
+    """
+    if limit < 1:
+        raise ValueError(f'limit must be at least 1, not {limit}')
+    loop = asyncio.get_running_loop()
+    in_flight: dict[asyncio.Future[Puzzle | PuzzleFormatError], str] = {}
+    try:
+        for filename in filenames:
+            if len(in_flight) >= limit:
+                for future in await _completed(in_flight, ordered):
+                    yield in_flight.pop(future), future.result()
+            in_flight[loop.run_in_executor(executor, _read_or_error, filename)] = filename
+        while in_flight:
+            for future in await _completed(in_flight, ordered):
+                yield in_flight.pop(future), future.result()
+    finally:
+        # if the caller stops iterating early, don't start any reads still queued
+        for future in in_flight:
+            future.cancel()
+
+
+async def _completed(in_flight: dict[asyncio.Future[Any], str], ordered: bool) -> list[asyncio.Future[Any]]:
+    if ordered:
+        oldest = next(iter(in_flight))
+        await asyncio.wait([oldest])
+        return [oldest]
+    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+    return [future for future in in_flight if future in done]
 
 
 def read_text(filename: str) -> Puzzle:
@@ -156,13 +279,14 @@ def read_text(filename: str) -> Puzzle:
         return load_text(f.read())
 
 
-def load(data: bytes) -> Puzzle:
+def load(data: bytes | bytearray | memoryview | mmap.mmap, lazy: bool = False) -> Puzzle:
     """
     Read .puz file data and return the Puzzle object.
+    If lazy is True, extension sections are decoded on first access (see Puzzle.load).
     raises PuzzleFormatError if there's any problem with the file format.
     """
     puz = Puzzle()
-    puz.load(data)
+    puz.load(data, lazy=lazy)
     return puz
 
 
@@ -174,6 +298,88 @@ def load_text(text: str) -> Puzzle:
     return from_text_format(text)
 
 
+def read_header(source: str | os.PathLike[str] | bytes | bytearray | memoryview | mmap.mmap) -> PuzzleHeader:
+    """
+    Read just the header and metadata strings of a .puz file, given either a filename
+    or the file's data (any of the buffer types that load() takes), and return a
+    PuzzleHeader. This is much cheaper than a full load: the grids, clues and extensions
+    are skipped and only the header checksum is verified.
+    raises PuzzleFormatError if the header can't be parsed.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return _parse_header(source)
+    with open(source, 'rb') as f:
+        return _parse_header(f.read())
+
+
+class PuzzleHeader(NamedTuple):
+    """Puzzle metadata as returned by read_header()"""
+    title: str
+    author: str
+    copyright: str
+    width: int
+    height: int
+    version: bytes
+    puzzletype: int
+    solution_state: int
+    numclues: int
+
+
+class PuzzleArrays(NamedTuple):
+    """The grids of a puzzle as returned by Puzzle.to_arrays(). With numpy installed
+    each grid is a (height, width) numpy array; otherwise it is a flat array.array in
+    row-major order. across and down hold, for each cell, the number of the entry
+    that covers it, or 0. rebus_solutions is the map of rebus keys to solutions that
+    the rebus table refers to (see Rebus.solutions).
+    """
+    width: int
+    height: int
+    solution: Any  # uint8 character codes in the puzzle's encoding
+    fill: Any  # uint8
+    black: Any  # uint8, 1 for black squares
+    markup: Any  # uint8 GridMarkup flags
+    rebus: Any  # uint8 rebus table values, see Rebus.table
+    across: Any  # uint32
+    down: Any  # uint32
+    rebus_solutions: dict[int, str]
+
+
+def _seek_header(s: PuzzleBuffer) -> None:
+    # advance to start - files may contain some data before the
+    # start of the puzzle use the ACROSS&DOWN magic string as a waypoint
+    if not s.seek_to(ACROSSDOWN, -2):
+        raise PuzzleFormatError("Data does not appear to represent a "
+                                "puzzle. Are you sure you didn't intend "
+                                "to use read?")
+
+
+def _version_encoding(version: bytes) -> str:
+    return ENCODING if int(version.split(b'.')[0]) < 2 else ENCODING_UTF8
+
+
+def _parse_header(data: bytes | bytearray | memoryview | mmap.mmap) -> PuzzleHeader:
+    s = PuzzleBuffer(data, readonly=True)
+    try:
+        _seek_header(s)
+        (_, _, cksum_hdr, _, fileversion, _, _, _,
+         width, height, numclues, puzzletype, solution_state) = s.unpack(HEADER_FORMAT)
+        cksum_data = struct.pack(HEADER_CKSUM_FORMAT, width, height, numclues, puzzletype, solution_state)
+        if cksum_hdr != data_cksum(cksum_data):
+            raise PuzzleFormatError('header checksum does not match')
+
+        version = fileversion[:3]
+        s.encoding = _version_encoding(version)
+        # jump over the solution and fill grids
+        s.skip(2 * width * height)
+        if not s.can_read():
+            raise PuzzleFormatError('puzzle data is truncated')
+        # as strict about truncated strings as a full load
+        title, author, copyright = s.read_strings(3)  # noqa: A001
+        return PuzzleHeader(title, author, copyright, width, height, version, puzzletype, solution_state, numclues)
+    finally:
+        s.release()
+
+
 class PuzzleFormatError(Exception):
     """
     Indicates a format error in the .puz file. May be thrown due to
@@ -189,6 +395,14 @@ class Puzzle:
     def __repr__(self) -> str:
         return f'Puzzle({self.width}x{self.height}, title={self.title!r}, author={self.author!r})'
 
+    def __getstate__(self) -> dict[str, Any]:
+        # the checksum cache is cheap to rebuild and would nearly double the pickled size,
+        # which matters when puzzles are sent back from worker processes (see load_many)
+        state = self.__dict__.copy()
+        state['_cksum_cache'] = {}
+        state['_original'] = None
+        return state
+
     def __init__(self, version: str | bytes = '1.3') -> None:
         """Initializes a blank puzzle
         """
@@ -205,27 +419,73 @@ class Puzzle:
         self.unk1 = b'\0' * 2
         self.unk2 = b'\0' * 12
         self.scrambled_cksum = 0
-        self.fill = ''
+        self._fill = ''  # see the fill property
         self.solution = ''
         self.clues: list[str] = []
         self.notes = ''
-        self.extensions: dict[bytes, bytes] = {}
+        self.extensions: MutableMapping[bytes, bytes] = {}
         # the folowing is so that we can round-trip values in order:
         self._extensions_order: list[bytes] = []
         self.puzzletype = PuzzleType.Normal
         self.solution_state = SolutionState.Unlocked
         self.helpers: dict[str, PuzzleHelper] = {}  # add-ons like Rebus and Markup
+        # encoded fields and their checksums, see _cksum_entry()
+        self._cksum_cache: dict[str, _CksumCacheEntry] = {}
+        # the bytes this puzzle was loaded from and a snapshot of its state at the time
+        self._original: tuple[bytes, tuple[Any, ...]] | None = None
+        # Grid objects handed out for the solution and fill, see _cached_grid()
+        self._grids: dict[str, Grid] = {}
 
-    def load(self, data: bytes) -> None:
-        s = PuzzleBuffer(data)
-
-        # advance to start - files may contain some data before the
-        # start of the puzzle use the ACROSS&DOWN magic string as a waypoint
-        # save the preamble for round-tripping
-        if not s.seek_to(ACROSSDOWN, -2):
-            raise PuzzleFormatError("Data does not appear to represent a "
-                                    "puzzle. Are you sure you didn't intend "
-                                    "to use read?")
+    @property
+    def fill(self) -> str:
+        # edits made through editor() are written back before the fill is read
+        editor = self.helpers.get('editor')
+        if editor is not None:
+            editor.save()
+        return self._fill
+
+    @fill.setter
+    def fill(self, fill: str) -> None:
+        self._fill = fill
+
+    def load(self, data: bytes | bytearray | memoryview | mmap.mmap, lazy: bool = False) -> None:
+        """Parse .puz file data into this puzzle.
+
+        With lazy=True, extension sections are not copied or checksummed during load.
+        Only their location is recorded, and each payload is materialized and verified on
+        first access through puzzle.extensions (or the Rebus, Markup and Timer helpers).
+        A lazily loaded puzzle keeps a reference to data, which is copied first unless
+        it is already bytes.
+
+        If data is bytes the puzzle also keeps a reference to it, and as long as the
+        puzzle is not modified, serializing it returns data as is.
+        """
+        self._original = None
+        lazy_extensions = None
+        if lazy:
+            data = data if isinstance(data, bytes) else bytes(data)
+            lazy_extensions = LazyExtensions(data)
+        s = PuzzleBuffer(data, readonly=True)
+        try:
+            self._load(s, lazy_extensions)
+        finally:
+            s.release()
+        if isinstance(data, bytes):
+            self._original = (data, self._state())
+
+    def _state(self) -> tuple[Any, ...]:
+        # everything that _sections() writes. Unchanged fields are usually the very same
+        # objects as in the snapshot taken on load, which makes comparing states cheap.
+        # A lazy extension map tracks its own changes so that it needn't be materialized.
+        ext = self.extensions
+        ext_state = (ext, ext.changes) if isinstance(ext, LazyExtensions) else tuple(ext.items())
+        return (self.preamble, self.fileversion, self.version, self.encoding, self.unk1, self.scrambled_cksum,
+                self.unk2, self.width, self.height, self.puzzletype, self.solution_state,
+                self.solution, self.fill, self.title, self.author, self.copyright, tuple(self.clues), self.notes,
+                tuple(self._extensions_order), ext_state, self.postscript)
+
+    def _load(self, s: PuzzleBuffer, lazy_extensions: LazyExtensions | None = None) -> None:
+        _seek_header(s)
 
         # save whatever we just jumped over so that we can round-trip it on save.
         self.preamble = bytes(s.data[:s.pos])
@@ -248,27 +508,33 @@ class Puzzle:
 
         self.version = self.fileversion[:3]
         # Once we have fileversion we can guess the encoding
-        self.encoding = ENCODING if self.version_tuple()[0] < 2 else ENCODING_UTF8
+        self.encoding = _version_encoding(self.version)
         s.encoding = self.encoding
 
-        self.solution = s.read(self.width * self.height).decode(self.encoding)
-        self.fill = s.read(self.width * self.height).decode(self.encoding)
+        self.solution = s.read_decoded(self.width * self.height)
+        self.fill = s.read_decoded(self.width * self.height)
 
-        self.title = s.read_string()
-        self.author = s.read_string()
-        self.copyright = s.read_string()
-
-        self.clues = [s.read_string() for _ in range(numclues)]
+        strings = s.read_strings(3 + numclues)
+        self.title, self.author, self.copyright = strings[:3]
+        self.clues = strings[3:]
+        # notes are read separately since files which end without any notes at all
+        # have always been accepted
         self.notes = s.read_string()
 
         ext_cksum: dict[bytes, int] = {}
+        if lazy_extensions is not None:
+            self.extensions = lazy_extensions
         while s.can_unpack(EXTENSION_HEADER_FORMAT):
             code, length, cksum = s.unpack(EXTENSION_HEADER_FORMAT)
-            ext_cksum[code] = cksum
-            # extension data is represented as a null-terminated string,
-            # but since the data can contain nulls we can't use read_string
-            self.extensions[code] = s.read(length)
-            s.read(1)  # extensions have a trailing byte
+            if lazy_extensions is not None:
+                lazy_extensions.add_section(code, s.pos, length, cksum)
+                s.skip(length)
+            else:
+                ext_cksum[code] = cksum
+                # extension data is represented as a null-terminated string,
+                # but since the data can contain nulls we can't use read_string
+                self.extensions[code] = s.read(length)
+            s.skip(1)  # extensions have a trailing byte
             # save the codes in order for round-tripping
             self._extensions_order.append(code)
 
@@ -289,39 +555,137 @@ class Puzzle:
                     f'extension {code} checksum does not match'
                 )
 
-    def save(self, filename: str) -> None:
-        puzzle_bytes = self.tobytes()
-        with open(filename, 'wb') as f:
-            f.write(puzzle_bytes)
+    def save(self, filename: str, atomic: bool = False, fsync: bool = False) -> None:
+        """Write the puzzle to filename.
+        With atomic=True the puzzle is written to a temporary file in the same
+        directory which is then renamed over filename, so readers (and crashes)
+        see either the old file or the new one, never a partially written one.
+        With fsync=True the data is flushed to disk before save returns.
+        """
+        # serialize before opening, so that a puzzle which can't be encoded
+        # doesn't truncate the existing file
+        sections = self._sections()
+        if not atomic:
+            with open(filename, 'wb') as f:
+                f.writelines(sections)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            return
+
+        dirname, basename = os.path.split(os.path.abspath(filename))
+        tmpname = os.path.join(dirname, f'.{basename}.{os.urandom(4).hex()}.tmp')
+        # created like open() would, so the umask applies rather than mkstemp's 0600
+        fd = os.open(tmpname, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.writelines(sections)
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+            # keep the permissions of the file being replaced
+            with contextlib.suppress(FileNotFoundError):
+                shutil.copymode(filename, tmpname)
+            os.replace(tmpname, filename)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmpname)
+            raise
+
+        if fsync and os.name == 'posix':
+            # make the rename itself durable
+            dirfd = os.open(dirname, os.O_RDONLY)
+            try:
+                os.fsync(dirfd)
+            finally:
+                os.close(dirfd)
+
+    def write(self, f: BinaryIO) -> None:
+        """Write the puzzle to a binary file object section by section, without
+        assembling the whole file in memory first.
+        """
+        for section in self._sections():
+            f.write(section)
+
+    def patch(self, filename: str, fsync: bool = False) -> bool:
+        """Update filename, a file previously saved from this puzzle, in place.
+        Only the sections whose bytes have changed are overwritten: during a solve
+        that is usually just the header checksums, the fill and the solving state
+        extensions (RUSR, GEXT, LTIM). If the file's size doesn't match the new
+        serialization, for example because an extension grew, the whole file is
+        replaced with an atomic save instead, so that it is never seen half written.
+        Returns True if the file was patched in place, False if it was replaced.
+        """
+        sections = self._sections()
+        with open(filename, 'r+b') as f:
+            old = memoryview(f.read())
+            patched = len(old) == sum(map(len, sections))
+            if patched:
+                pos = 0
+                for section in sections:
+                    end = pos + len(section)
+                    if old[pos:end] != section:
+                        f.seek(pos)
+                        f.write(section)
+                    pos = end
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            old.release()
+        if not patched:
+            self.save(filename, atomic=True, fsync=fsync)
+        return patched
+
+    async def asave(self, filename: str, atomic: bool = False, fsync: bool = False,
+                    executor: concurrent.futures.Executor | None = None) -> None:
+        """Save without blocking the event loop. Serialization and file I/O run on
+        executor (the loop's default executor if None), so the puzzle should not be
+        modified until this completes.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, functools.partial(self.save, filename, atomic=atomic, fsync=fsync))
 
     def tobytes(self) -> bytes:
-        s = PuzzleBuffer(encoding=self.encoding)
+        # join sizes the output from its parts, so it is built with a single allocation
+        return b''.join(self._sections())
+
+    def _sections(self) -> list[bytes]:
+        """Serialize the puzzle as a list of byte strings which concatenate to the
+        file contents. Every field is encoded exactly once and the checksums are
+        computed over those same bytes (and cached, see _cksum_entry), so the
+        header can be packed before the sections that follow it.
+        """
         # commit any changes from helpers
         for h in self.helpers.values():
             if isinstance(h, PuzzleHelper):
                 h.save()
 
-        # include any preamble text we might have found on read
-        s.write(self.preamble)
-
-        s.pack(HEADER_FORMAT,
-               self.global_cksum(), ACROSSDOWN,
-               self.header_cksum(), self.magic_cksum(),
-               self.fileversion, self.unk1, self.scrambled_cksum,
-               self.unk2, self.width, self.height,
-               len(self.clues), self.puzzletype, self.solution_state)
-
-        s.write(self.encode(self.solution))
-        s.write(self.encode(self.fill))
-
-        s.write_string(self.title)
-        s.write_string(self.author)
-        s.write_string(self.copyright)
+        # an unmodified puzzle is written out exactly as it was loaded
+        if self._original is not None and self._original[1] == self._state():
+            return [self._original[0]]
 
-        for clue in self.clues:
-            s.write_string(clue)
+        header = self._header_entry()
+        solution = self._solution_entry()
+        fill = self._fill_entry()
+        text = self._text_entry()
 
-        s.write_string(self.notes)
+        # extensions do not seem to be included in global cksum
+        cksum_global = text.cksum(fill.cksum(solution.cksum(header.cksum())))
+        cksum_magic = self._magic_cksum(header.cksum(), solution.cksum(), fill.cksum(), text.cksum())
+
+        sections = [
+            # include any preamble text we might have found on read
+            self.preamble,
+            struct.pack(HEADER_FORMAT,
+                        cksum_global, ACROSSDOWN,
+                        header.cksum(), cksum_magic,
+                        self.fileversion, self.unk1, self.scrambled_cksum,
+                        self.unk2, self.width, self.height,
+                        len(self.clues), self.puzzletype, self.solution_state),
+            solution.output,
+            fill.output,
+            text.output,
+        ]
 
         # do a bit of extra work here to ensure extensions round-trip in the
         # order they were read. this makes verification easier. But allow
@@ -331,21 +695,21 @@ class Puzzle:
         for code in self._extensions_order:
             data = ext.pop(code, None)
             if data:
-                s.pack(EXTENSION_HEADER_FORMAT, code,
-                       len(data), data_cksum(data))
-                s.write(data + b'\0')
+                sections += self._extension_sections(code, data)
 
         for code, data in ext.items():
-            s.pack(EXTENSION_HEADER_FORMAT, code, len(data), data_cksum(data))
-            s.write(data + b'\0')
+            sections += self._extension_sections(code, data)
 
         # postscript is initialized, read, and stored as bytes. In case it is
         # overwritten as a string, this try/except converts it back.
         postscript_bytes = self.postscript.encode(self.encoding, ENCODING_ERRORS) \
             if isinstance(self.postscript, str) else self.postscript
-        s.write(postscript_bytes)
+        sections.append(postscript_bytes)
+        return sections
 
-        return s.tobytes()
+    def _extension_sections(self, code: bytes, data: bytes) -> tuple[bytes, bytes, bytes]:
+        cksum = self._extension_entry(code, data).cksum()
+        return struct.pack(EXTENSION_HEADER_FORMAT, code, len(data), cksum), data, b'\0'
 
     def encode(self, s: str) -> bytes:
         return s.encode(self.encoding, ENCODING_ERRORS)
@@ -397,6 +761,17 @@ class Puzzle:
             self.helpers['clues'] = ClueNumbering(self)
         return cast('ClueNumbering', self.helpers['clues'])
 
+    def editor(self) -> FillEditor:
+        if 'editor' not in self.helpers:
+            self.helpers['editor'] = FillEditor(self)
+        return cast('FillEditor', self.helpers['editor'])
+
+    def clue_table(self) -> ClueTable:
+        """The clue numbering as a compact ClueTable. Unlike clue_numbering() this is
+        not kept on the puzzle, so a new table is built on every call.
+        """
+        return ClueTable(self.solution, self.clues, self.width, self.height, self)
+
     def blacksquare(self) -> str:
         return BLACKSQUARE2 if self.puzzletype == PuzzleType.Diagramless else BLACKSQUARE
 
@@ -440,53 +815,92 @@ class Puzzle:
             return all(a == b for a, b in zip(fill, self.solution) if b != self.blacksquare() and a != BLANKSQUARE)
         return False
 
+    def locked_checker(self, fill: str | None = None) -> LockedChecker:
+        """Return a LockedChecker for checking fill (the puzzle's fill by default) against
+        the locked solution as it is edited cell by cell.
+        """
+        return LockedChecker(self, fill)
+
     def check_rebus_answers(self, strict: bool = True) -> bool:
         if self.has_rebus():
             return self.rebus().check_rebus_fill(strict=strict)
         # if no rebus just return True since there's nothing to check
         return True
 
-    def header_cksum(self, cksum: int = 0) -> int:
-        return data_cksum(struct.pack(HEADER_CKSUM_FORMAT,
-                          self.width, self.height, len(self.clues),
-                          self.puzzletype, self.solution_state), cksum)
+    def _cksum_entry(self, name: str, key: tuple[Any, ...],
+                     encode: Callable[[], tuple[bytes, bytes | None]]) -> _CksumCacheEntry:
+        # Checksummed fields are cached along with the values they were computed from.
+        # Assigning a new value to any of those attributes (or editing the clues list in
+        # place) changes the key, so the stale entry is simply replaced on next use.
+        entry = self._cksum_cache.get(name)
+        if entry is None or entry.key != key:
+            entry = self._cksum_cache[name] = _CksumCacheEntry(key, *encode())
+        return entry
 
-    def text_cksum(self, cksum: int = 0) -> int:
+    def _header_entry(self) -> _CksumCacheEntry:
+        key = (self.width, self.height, len(self.clues), self.puzzletype, self.solution_state)
+        return self._cksum_entry('header', key, lambda: (struct.pack(HEADER_CKSUM_FORMAT, *key), None))
+
+    def _solution_entry(self) -> _CksumCacheEntry:
+        return self._cksum_entry('solution', (self.encoding, self.solution), lambda: (self.encode(self.solution), None))
+
+    def _fill_entry(self) -> _CksumCacheEntry:
+        return self._cksum_entry('fill', (self.encoding, self.fill), lambda: (self.encode(self.fill), None))
+
+    def _text_entry(self) -> _CksumCacheEntry:
+        # notes included in global cksum starting v1.3 of format
+        include_notes = self.version_tuple() >= (1, 3)
+        key = (self.encoding, include_notes, self.title, self.author, self.copyright, tuple(self.clues), self.notes)
+        return self._cksum_entry('text', key, lambda: self._encode_text(include_notes))
+
+    def _extension_entry(self, code: bytes, data: bytes) -> _CksumCacheEntry:
+        return self._cksum_entry(f'extension {code!r}', (data,), lambda: (data, None))
+
+    def _encode_text(self, include_notes: bool) -> tuple[bytes, bytes]:
+        # every string is encoded once and used for both the checksum and the file;
+        # None is written as an empty string, as PuzzleBuffer.write_string does
+        title, author, copyright, *clues, notes = [  # noqa: A001
+            self.encode(s or '') for s in (self.title, self.author, self.copyright, *self.clues, self.notes)
+        ]
         # for the checksum to work these fields must be added in order with
         # null termination, followed by all non-empty clues without null
         # termination, followed by notes (but only for version >= 1.3)
-        if self.title:
-            cksum = data_cksum(self.encode_zstring(self.title), cksum)
-        if self.author:
-            cksum = data_cksum(self.encode_zstring(self.author), cksum)
-        if self.copyright:
-            cksum = data_cksum(self.encode_zstring(self.copyright), cksum)
+        parts: list[bytes] = []
+        for field in (title, author, copyright):
+            if field:
+                parts += (field, b'\0')
 
-        for clue in self.clues:
-            if clue:
-                cksum = data_cksum(self.encode(clue), cksum)
+        parts.extend(clue for clue in clues if clue)
 
-        # notes included in global cksum starting v1.3 of format
-        if self.version_tuple() >= (1, 3) and self.notes:
-            cksum = data_cksum(self.encode_zstring(self.notes), cksum)
+        if include_notes and notes:
+            parts += (notes, b'\0')
 
-        return cksum
+        # in the file every string is null-terminated, empty or not
+        return b''.join(parts), b'\0'.join((title, author, copyright, *clues, notes, b''))
+
+    def header_cksum(self, cksum: int = 0) -> int:
+        return self._header_entry().cksum(cksum)
+
+    def text_cksum(self, cksum: int = 0) -> int:
+        return self._text_entry().cksum(cksum)
 
     def global_cksum(self) -> int:
         cksum = self.header_cksum()
-        cksum = data_cksum(self.encode(self.solution), cksum)
-        cksum = data_cksum(self.encode(self.fill), cksum)
+        cksum = self._solution_entry().cksum(cksum)
+        cksum = self._fill_entry().cksum(cksum)
         # extensions do not seem to be included in global cksum
         return self.text_cksum(cksum)
 
     def magic_cksum(self) -> int:
-        cksums = [
+        return self._magic_cksum(
             self.header_cksum(),
-            data_cksum(self.encode(self.solution)),
-            data_cksum(self.encode(self.fill)),
+            self._solution_entry().cksum(),
+            self._fill_entry().cksum(),
             self.text_cksum()
-        ]
+        )
 
+    @staticmethod
+    def _magic_cksum(*cksums: int) -> int:
         cksum_magic = 0
         for (i, cksum) in enumerate(reversed(cksums)):
             cksum_magic <<= 8
@@ -499,23 +913,207 @@ class Puzzle:
 
         return cksum_magic
 
+    def to_arrays(self) -> PuzzleArrays:
+        """The solution, fill, black squares, markup, rebus table and clue numbers as
+        arrays (see PuzzleArrays), for handing to numerical code.
+        """
+        n = self.width * self.height
+        solution, fill = self.encode(self.solution), self.encode(self.fill)
+        if len(solution) != n or len(fill) != n:
+            raise ValueError('solution and fill must encode to one byte per cell')
+        black = _black_mask(self.solution, BLACKSQUARE + BLACKSQUARE2)
+        # read the extensions directly unless a helper may hold unsaved changes
+        markup = bytes(self.markup().markup) if 'markup' in self.helpers else self.extensions.get(Extensions.Markup, b'')
+        rebus = bytes(self.rebus().table) if 'rebus' in self.helpers else self.extensions.get(Extensions.Rebus, b'')
+        has_solutions = 'rebus' in self.helpers or Extensions.RebusSolutions in self.extensions
+        rebus_solutions = dict(self.rebus().solutions) if has_solutions else {}
+
+        across_numbers = array.array('I', [0]) * n
+        down_numbers = array.array('I', [0]) * n
+        across, down = _numbering_skeleton(self.width, self.height, black)
+        for entry in across:
+            across_numbers[entry['cell']:entry['cell'] + entry['len']] = array.array('I', [entry['num']]) * entry['len']
+        for entry in down:
+            stop = entry['cell'] + entry['len'] * self.width
+            down_numbers[entry['cell']:stop:self.width] = array.array('I', [entry['num']]) * entry['len']
+
+        grids = [array.array('B', grid) for grid in (solution, fill, black, (markup + bytes(n))[:n], (rebus + bytes(n))[:n])]
+        grids += [across_numbers, down_numbers]
+        numpy = _numpy()
+        if numpy is not None:
+            shape = (self.height, self.width)
+            dtypes = {'B': numpy.uint8, 'I': numpy.uint32}
+            grids = [numpy.frombuffer(grid, dtype=dtypes[grid.typecode]).reshape(shape) for grid in grids]
+        return PuzzleArrays._make([self.width, self.height, *grids, rebus_solutions])
+
+    def from_arrays(self, arrays: PuzzleArrays) -> None:
+        """Set the size, solution, fill, markup and rebus table and solutions of this
+        puzzle from arrays as returned by to_arrays(), with or without numpy. The black
+        squares and clue numbers follow from the solution, so those arrays are not read.
+        """
+        n = arrays.width * arrays.height
+        grids = [_array_bytes(grid) for grid in (arrays.solution, arrays.fill, arrays.markup, arrays.rebus)]
+        if any(len(grid) != n for grid in grids):
+            raise ValueError(f'arrays must have {arrays.width}x{arrays.height} cells')
+        solution, fill, markup, rebus = grids
+        # rebus table values are solution keys plus one
+        missing = sorted({v - 1 for v in set(rebus) if v} - arrays.rebus_solutions.keys())
+        if missing:
+            raise ValueError(f'rebus table refers to missing rebus solutions {missing}')
+
+        self.width, self.height = arrays.width, arrays.height
+        self.solution = solution.decode(self.encoding, ENCODING_ERRORS)
+        self.fill = fill.decode(self.encoding, ENCODING_ERRORS)
+        markup_helper = self.markup()
+        markup_helper.markup = list(markup)
+        markup_helper._dirty = True
+        rebus_helper = self.rebus()
+        rebus_helper.table = list(rebus)
+        rebus_helper.solutions = dict(arrays.rebus_solutions)
+        if len(rebus_helper.fill) != n:
+            rebus_helper.fill = [''] * n
+        rebus_helper._dirty = True
+
     def grid(self) -> Grid:
-        return Grid(self.fill, self.width, self.height)
+        return self._cached_grid('fill')
 
     def solution_grid(self) -> Grid:
-        return Grid(self.solution, self.width, self.height)
+        return self._cached_grid('solution')
+
+    def answers(self) -> list[str]:
+        """The solution string of every entry in clue order, so answers()[i] answers clues[i]"""
+        return self._entry_strings(self.solution)
+
+    def fills(self) -> list[str]:
+        """The fill string of every entry in clue order, so fills()[i] is the entry for clues[i]"""
+        return self._entry_strings(self.fill)
+
+    def _entry_strings(self, grid: str) -> list[str]:
+        mask = _black_mask(self.solution, BLACKSQUARE + BLACKSQUARE2)
+        return [grid[entry] for entry in _entry_slices(self.width, self.height, mask)]
+
+    def _cached_grid(self, field: str) -> Grid:
+        # the Grid is kept until the field is reassigned or the puzzle resized
+        grid = getattr(self, field)
+        cached = self._grids.get(field)
+        if cached is None or cached.grid is not grid or (cached.width, cached.height) != (self.width, self.height):
+            cached = self._grids[field] = Grid(grid, self.width, self.height)
+        return cached
+
+
+class _CksumCacheEntry:
+    """Encoded bytes of a checksummed Puzzle field, along with the checksums
+    that have been computed over them, keyed by starting checksum value.
+    """
+    __slots__ = ('cksums', 'data', 'key', 'output')
+
+    # a field is checksummed from 0 for the magic cksum and from the running
+    # value for the global cksum, so only a couple of starting values are live
+    MAX_CKSUMS = 4
+
+    def __init__(self, key: tuple[Any, ...], data: bytes, output: bytes | None = None) -> None:
+        self.key = key
+        self.data = data
+        # the field as written to the file, when that differs from what is checksummed
+        self.output = data if output is None else output
+        self.cksums: dict[int, int] = {}
+
+    def cksum(self, start: int = 0) -> int:
+        cksum = self.cksums.get(start)
+        if cksum is None:
+            if len(self.cksums) >= self.MAX_CKSUMS:
+                self.cksums.clear()
+            cksum = self.cksums[start] = data_cksum(self.data, start)
+        return cksum
+
+
+class LockedChecker:
+    """Checks a fill against a locked solution, like Puzzle.check_answers, while the
+    fill is edited one cell at a time.
+
+    The scrambled checksum is computed over the fill's letters in column-major order,
+    so the checker keeps the checksum state after each byte of them. Changing a cell
+    only recomputes the states from that cell's position onward.
+    """
+    def __repr__(self) -> str:
+        return f'LockedChecker(cells={len(self._positions)}, correct={self.is_correct()})'
+
+    def __init__(self, puzzle: Puzzle, fill: str | None = None) -> None:
+        if not puzzle.is_solution_locked():
+            raise ValueError('puzzle solution is not locked')
+        fill = puzzle.fill if fill is None else fill
+        if len(fill) != puzzle.width * puzzle.height:
+            raise ValueError('fill does not match the size of the puzzle')
+        self.encoding = puzzle.encoding
+        self.scrambled_cksum = puzzle.scrambled_cksum
+        self._fill = list(fill)
+        cells = _column_major_cells(puzzle.width, puzzle.height, _black_mask(fill, puzzle.blacksquare()))
+        # position of each cell in the checksummed data; black squares aren't included
+        self._positions = {cell: pos for pos, cell in enumerate(cells)}
+        encoded = [fill[cell].encode(self.encoding, ENCODING_ERRORS) for cell in cells]
+        self._data = bytearray(b''.join(encoded))
+        # byte offset of each position in _data, plus the end
+        self._offsets = [0, *itertools.accumulate(map(len, encoded))]
+        # _states[k] is the checksum of the first k bytes of _data
+        self._states = [0]
+        self._update(0)
+
+    @property
+    def fill(self) -> str:
+        return ''.join(self._fill)
+
+    def set_cell(self, i: int, ch: str) -> None:
+        """Set cell i (in row-major order) of the fill to ch, a single character"""
+        if len(ch) != 1:
+            raise ValueError(f'cell {i} must be set to a single character, not {ch!r}')
+        pos = self._positions.get(i)
+        if pos is None:
+            raise ValueError(f'cell {i} is a black square')
+        if ch != self._fill[i]:
+            data = ch.encode(self.encoding, ENCODING_ERRORS)
+            start, end = self._offsets[pos], self._offsets[pos + 1]
+            self._fill[i] = ch
+            self._data[start:end] = data
+            if len(data) != end - start:
+                delta = len(data) - (end - start)
+                self._offsets[pos + 1:] = [offset + delta for offset in self._offsets[pos + 1:]]
+            self._update(start)
+
+    def is_correct(self) -> bool:
+        return self._states[-1] & 0xffff == self.scrambled_cksum
+
+    def _update(self, start: int) -> None:
+        # the same recurrence as data_cksum, recording the state after each byte
+        rotate = _get_cksum_rotate_table()
+        cksum = self._states[start]
+        self._states[start + 1:] = [cksum := rotate[cksum] + b for b in self._data[start:]]
 
 
 class PuzzleBuffer:
     """PuzzleBuffer class
     wraps a bytes object and provides .puz-specific methods for
     reading and writing data
+
+    By default the data is copied into a growable bytearray. With readonly=True
+    the buffer instead wraps a memoryview of the caller's bytes (or mmap), so
+    nothing is copied up front and strings are decoded straight from the view.
+    A read-only buffer cannot be written to.
     """
     def __repr__(self) -> str:
         return f'PuzzleBuffer(pos={self.pos}, length={len(self.data)}, encoding={self.encoding!r})'
 
-    def __init__(self, data: bytes | None = None, encoding: str = ENCODING):
-        self.data = bytearray(data) if data else bytearray()
+    def __init__(self, data: bytes | bytearray | memoryview | mmap.mmap | None = None, encoding: str = ENCODING,
+                 readonly: bool = False):
+        self.data: bytearray | memoryview
+        if readonly:
+            # searching needs the underlying object: bytes, bytearray and mmap all have find()
+            # but memoryview doesn't, so a caller's memoryview is copied once
+            source = data if data is not None else b''
+            self._source = bytes(source) if isinstance(source, memoryview) else source
+            self.data = memoryview(self._source)
+        else:
+            self.data = bytearray(data) if data else bytearray()
+            self._source = self.data
         self.encoding = encoding
         self.pos = 0
 
@@ -530,6 +1128,14 @@ class PuzzleBuffer:
         self.pos += n_bytes
         return bytes(self.data[start:self.pos])
 
+    def read_decoded(self, n_bytes: int) -> str:
+        start = self.pos
+        self.pos += n_bytes
+        return str(self.data[start:self.pos], self.encoding)
+
+    def skip(self, n_bytes: int) -> None:
+        self.pos += n_bytes
+
     def read_to_end(self) -> bytes:
         start = self.pos
         self.pos = self.length()
@@ -538,29 +1144,57 @@ class PuzzleBuffer:
     def read_string(self) -> str:
         return self.read_until(b'\0')
 
+    def read_strings(self, count: int) -> list[str]:
+        """Read count consecutive null-terminated strings. The terminators are located
+        first and the whole table is then decoded in a single operation.
+        raises PuzzleFormatError if the data ends before the last terminator.
+        """
+        start = end = self.pos
+        for i in range(count):
+            end = self._source.find(b'\0', end)
+            if end < 0:
+                raise PuzzleFormatError(f'string table is truncated: found {i} of {count} strings at {start}')
+            end += 1
+        self.pos = end
+        if not count:
+            return []
+        # a null byte never occurs inside a multi-byte UTF-8 sequence, so it's safe
+        # to decode first and split afterwards
+        return str(self.data[start:end - 1], self.encoding).split('\0')
+
     def read_until(self, c: bytes) -> str:
         start = self.pos
         self.seek_to(c, 1)  # read past
         return str(self.data[start:self.pos-1], self.encoding)
 
     def seek_to(self, s: bytes, offset: int = 0) -> bool:
-        try:
-            self.pos = self.data.index(s, self.pos) + offset
-            return True
-        except ValueError:
+        found = self._source.find(s, self.pos)
+        if found < 0:
             # s not found, advance to end
             self.pos = self.length()
             return False
+        self.pos = found + offset
+        return True
+
+    def release(self) -> None:
+        """Release the view held by a read-only buffer, e.g. before closing an mmap."""
+        if isinstance(self.data, memoryview):
+            self.data.release()
+
+    def _writable(self) -> bytearray:
+        if not isinstance(self.data, bytearray):
+            raise TypeError('cannot write to a read-only PuzzleBuffer')
+        return self.data
 
     def write(self, s: bytes) -> None:
-        self.data.extend(s)
+        self._writable().extend(s)
 
     def write_string(self, s: str | None) -> None:
         s = s or ''
-        self.data.extend(s.encode(self.encoding, ENCODING_ERRORS) + b'\0')
+        self._writable().extend(s.encode(self.encoding, ENCODING_ERRORS) + b'\0')
 
     def pack(self, struct_format: str, *values: Any) -> None:
-        self.data.extend(struct.pack(struct_format, *values))
+        self._writable().extend(struct.pack(struct_format, *values))
 
     def can_unpack(self, struct_format: str) -> bool:
         return self.can_read(struct.calcsize(struct_format))
@@ -579,66 +1213,167 @@ class PuzzleBuffer:
         return bytes(self.data)
 
 
+class LazyExtensions(MutableMapping[bytes, bytes]):
+    """Extension map used by lazily loaded puzzles
+
+    Each extension section starts out as a reference (offset, length, checksum) into the
+    data the puzzle was loaded from. Its payload is copied out and its checksum verified
+    the first time it is looked up, raising PuzzleFormatError if the checksum does not
+    match. Membership tests, iteration and assignment never touch the payload.
+    """
+    def __repr__(self) -> str:
+        return f'LazyExtensions(codes={list(self._items)}, pending={self.pending()})'
+
+    def __init__(self, source: bytes) -> None:
+        self._source = source
+        self._items: dict[bytes, bytes | tuple[int, int, int]] = {}
+        # bumped whenever the mapping changes, so Puzzle can tell an unmodified
+        # map apart without materializing anything
+        self.changes = 0
+
+    def add_section(self, code: bytes, offset: int, length: int, cksum: int) -> None:
+        self._items[code] = (offset, length, cksum)
+
+    def pending(self) -> list[bytes]:
+        """Codes of extensions whose payload has not been materialized yet"""
+        return [code for code, value in self._items.items() if isinstance(value, tuple)]
+
+    def __getitem__(self, code: bytes) -> bytes:
+        value = self._items[code]
+        if isinstance(value, tuple):
+            offset, length, cksum = value
+            value = self._source[offset:offset + length]
+            if cksum != data_cksum(value):
+                raise PuzzleFormatError(f'extension {code} checksum does not match')
+            self._items[code] = value
+        return value
+
+    def __setitem__(self, code: bytes, value: bytes) -> None:
+        # helpers write their extension back on every save, usually unchanged
+        if self._items.get(code) != value:
+            self.changes += 1
+        self._items[code] = value
+
+    def __delitem__(self, code: bytes) -> None:
+        del self._items[code]
+        self.changes += 1
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._items
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
 # clue numbering helper
 def get_grid_numbering(grid: str, width: int, height: int) -> tuple[list[ClueEntry], list[ClueEntry]]:
-    # Add numbers to the grid based on positions of black squares
-    def col(index: int) -> int:
-        return index % width
+    # Add numbers to the grid based on positions of black squares. The numbering only
+    # depends on where the black squares are, so it is computed once per grid pattern
+    # (see set_numbering_cache_size) and each call gets its own copy of the entries
+    across, down = _numbering_skeleton(width, height, _black_mask(grid, BLACKSQUARE + BLACKSQUARE2))
+    return [ClueEntry(entry) for entry in across], [ClueEntry(entry) for entry in down]
+
+
+def _grid_numbering_skeleton(width: int, height: int, mask: bytes) -> tuple[tuple[dict[str, Any], ...], ...]:
+    # Entries are the runs of two or more white cells in each row and column, which
+    # are found with one sweep over the rows and one over the columns of the mask.
+    # The returned dicts are templates and are only ever copied.
+    across_lengths: dict[int, int] = {}
+    for row in range(height):
+        for run in _WHITE_RUN.finditer(mask, row * width, (row + 1) * width):
+            across_lengths[run.start()] = run.end() - run.start()
+
+    # the columns of the mask, one after the other
+    columns = b''.join(mask[col::width] for col in range(width))
+    down_lengths: dict[int, int] = {}
+    for col in range(width):
+        for run in _WHITE_RUN.finditer(columns, col * height, (col + 1) * height):
+            down_lengths[(run.start() - col * height) * width + col] = run.end() - run.start()
+
+    across: list[dict[str, Any]] = []
+    down: list[dict[str, Any]] = []
+    count = 0  # count is the index into the clues list; 0-based and counts across and down together
+    # num is the clue number that gets printed in the grid; i is the cell index in row-major order
+    for num, i in enumerate(sorted(across_lengths.keys() | down_lengths.keys()), 1):
+        row, col = divmod(i, width)
+        if i in across_lengths:
+            across.append({
+                'num': num,
+                'clue': None,  # filled in by caller
+                'clue_index': count,
+                'cell': i,
+                'row': row,
+                'col': col,
+                'len': across_lengths[i],
+                'dir': 'across',
+            })
+            count += 1
+        if i in down_lengths:
+            down.append({
+                'num': num,
+                'clue': None,  # filled in by caller
+                'clue_index': count,
+                'cell': i,
+                'row': row,
+                'col': col,
+                'len': down_lengths[i],
+                'dir': 'down'
+            })
+            count += 1
+
+    return tuple(across), tuple(down)
+
+
+_numbering_skeleton = functools.lru_cache(maxsize=128)(_grid_numbering_skeleton)
+
+
+def set_numbering_cache_size(maxsize: int | None) -> None:
+    """
+    Set how many grid patterns get_grid_numbering (and so clue_numbering) keeps the
+    numbering of, least recently used first out. 0 disables the cache and None lets it
+    grow without bound. This also clears the cache and its statistics.
+    """
+    global _numbering_skeleton
+    _numbering_skeleton = functools.lru_cache(maxsize=maxsize)(_grid_numbering_skeleton)
 
-    def row(index: int) -> int:
-        return index // width
 
-    def len_across(index: int) -> int:
-        c = 0
-        for c in range(width - col(index)):
-            if is_blacksquare(grid[index + c]):
-                return c
-        return c + 1
+def numbering_cache_info() -> functools._CacheInfo:
+    """Hits, misses, maxsize and current size of the numbering cache"""
+    return _numbering_skeleton.cache_info()
 
-    def len_down(index: int) -> int:
-        c = 0
-        for c in range(height - row(index)):
-            if is_blacksquare(grid[index + c*width]):
-                return c
-        return c + 1
 
-    across: list[ClueEntry] = []
-    down: list[ClueEntry] = []
-    count = 0  # count is the index into the clues list; 0-based and counts across and down together
-    num = 1  # num is the clue number that gets printed in the grid
-    for i in range(len(grid)):  # i is the cell index in row-major order
-        if not is_blacksquare(grid[i]):
-            lastc = count
-            is_across = col(i) == 0 or is_blacksquare(grid[i - 1])
-            if is_across and len_across(i) > 1:
-                across.append(ClueEntry({
-                    'num': num,
-                    'clue': None,  # filled in by caller
-                    'clue_index': count,
-                    'cell': i,
-                    'row': row(i),
-                    'col': col(i),
-                    'len': len_across(i),
-                    'dir': 'across',
-                }))
-                count += 1
-            is_down = row(i) == 0 or is_blacksquare(grid[i - width])
-            if is_down and len_down(i) > 1:
-                down.append(ClueEntry({
-                    'num': num,
-                    'clue': None,  # filled in by caller
-                    'clue_index': count,
-                    'cell': i,
-                    'row': row(i),
-                    'col': col(i),
-                    'len': len_down(i),
-                    'dir': 'down'
-                }))
-                count += 1
-            if count > lastc:
-                num += 1
+def _numpy() -> Any:
+    # numpy is an optional dependency (pip install puzpy[numpy]); None if it is missing
+    try:
+        return importlib.import_module('numpy')
+    except ImportError:
+        return None
+
+
+def _array_bytes(values: Any) -> bytes:
+    # the cells of a numpy array or array.array as bytes, in row-major order
+    if hasattr(values, 'ravel'):
+        values = values.ravel()
+    return bytes(values.tolist())
+
 
-    return across, down
+def _entry_slices(width: int, height: int, mask: bytes) -> list[slice]:
+    # the slice of the grid string that each entry covers, in clue order; this rides
+    # on the numbering cache rather than keeping a cache of its own
+    across, down = _numbering_skeleton(width, height, mask)
+    slices = [slice(0)] * (len(across) + len(down))
+    for entry in across:
+        slices[entry['clue_index']] = slice(entry['cell'], entry['cell'] + entry['len'])
+    for entry in down:
+        slices[entry['clue_index']] = slice(entry['cell'], entry['cell'] + entry['len'] * width, width)
+    return slices
+
+
+# two or more white cells in a row of a black square mask, see _black_mask
+_WHITE_RUN = re.compile(b'\x00{2,}')
 
 
 @runtime_checkable
@@ -658,6 +1393,7 @@ class DefaultClueNumbering(PuzzleHelper):
         self.height = height
 
         self.across, self.down = get_grid_numbering(grid, width, height)
+        self._cell_indexes: dict[str, tuple[list[int], list[int]]] = {}
         for entry in self.across:
             entry['clue'] = clues[entry['clue_index']]
         for entry in self.down:
@@ -666,6 +1402,63 @@ class DefaultClueNumbering(PuzzleHelper):
     def save(self) -> None:
         pass  # clue numbering is derived from the grid and clues, so no need to save anything back to the puzzle
 
+    def entry_at(self, cell: int, direction: str) -> ClueEntry | None:
+        """The across or down entry that contains cell, or None if there isn't one"""
+        index = self._cell_index(direction)[0][cell]
+        return self._entries(direction)[index] if index >= 0 else None
+
+    def position_in_entry(self, cell: int, direction: str) -> int | None:
+        """The offset of cell within its across or down entry, or None if there isn't one"""
+        position = self._cell_index(direction)[1][cell]
+        return position if position >= 0 else None
+
+    def cells_of(self, entry: ClueEntry) -> range:
+        """The indexes of the cells of entry, in order"""
+        step = 1 if entry['dir'] == 'across' else self.width
+        return range(entry['cell'], entry['cell'] + entry['len'] * step, step)
+
+    def next_entry(self, entry: ClueEntry) -> ClueEntry:
+        """The entry after entry in its direction. The last across entry is followed
+        by the first down entry and the last down entry by the first across entry.
+        """
+        return self._step_entry(entry, 1)
+
+    def prev_entry(self, entry: ClueEntry) -> ClueEntry:
+        """The entry before entry, the reverse of next_entry"""
+        return self._step_entry(entry, -1)
+
+    def _step_entry(self, entry: ClueEntry, step: int) -> ClueEntry:
+        entries = self._entries(entry['dir'])
+        others = self.down if entry['dir'] == 'across' else self.across
+        index = self._cell_index(entry['dir'])[0][entry['cell']] + step
+        if 0 <= index < len(entries):
+            return entries[index]
+        if others:
+            return others[0] if step > 0 else others[-1]
+        return entries[index % len(entries)]
+
+    def _entries(self, direction: str) -> list[ClueEntry]:
+        if direction == 'across':
+            return self.across
+        if direction == 'down':
+            return self.down
+        raise AssertionError("dir not one of 'across' or 'down'")
+
+    def _cell_index(self, direction: str) -> tuple[list[int], list[int]]:
+        # for each cell, the index of the entry containing it and the cell's position
+        # in that entry, or -1 for both; built on first use
+        index = self._cell_indexes.get(direction)
+        if index is None:
+            entries = self._entries(direction)
+            entry_at = [-1] * (self.width * self.height)
+            position_in_entry = [-1] * (self.width * self.height)
+            for i, entry in enumerate(entries):
+                cells = self.cells_of(entry)
+                entry_at[cells.start:cells.stop:cells.step] = [i] * len(cells)
+                position_in_entry[cells.start:cells.stop:cells.step] = range(len(cells))
+            index = self._cell_indexes[direction] = (entry_at, position_in_entry)
+        return index
+
     # The following methods are no longer in use, but left here in case
     # anyone was using them externally. They may be removed in a future release.
     def col(self, index: int) -> int:
@@ -701,6 +1494,282 @@ class ClueNumbering(DefaultClueNumbering):
             entry._puzzle = puzzle
 
 
+class EditableNumbering(DefaultClueNumbering):
+    """Clue numbering for a grid whose black squares are being edited, as in a
+    construction tool. toggle_block() updates the numbering in place: only the rows
+    and columns through the toggled cells are rescanned, and entries are renumbered
+    from the first start cell that appeared or disappeared. clues is a copy of the
+    clue list passed in, and is kept in step with the entries.
+    """
+    def __repr__(self) -> str:
+        return f'EditableNumbering(across={len(self.across)}, down={len(self.down)})'
+
+    def __init__(self, grid: str, clues: list[str], width: int, height: int) -> None:
+        self._chars = list(grid)
+        super().__init__(grid, list(clues), width, height)
+        self._mask = bytearray(_black_mask(grid, BLACKSQUARE + BLACKSQUARE2))
+        # lengths of the entries starting at each cell, and those cells in order
+        self._lengths: dict[str, dict[int, int]] = {
+            'across': {e['cell']: e['len'] for e in self.across},
+            'down': {e['cell']: e['len'] for e in self.down},
+        }
+        self._starts: dict[str, list[int]] = {d: sorted(lengths) for d, lengths in self._lengths.items()}
+        self._numbered = sorted(set(self._starts['across']).union(self._starts['down']))
+
+    @property
+    def grid(self) -> str:
+        return ''.join(self._chars)
+
+    @grid.setter
+    def grid(self, grid: str) -> None:
+        self._chars = list(grid)
+
+    def toggle_block(self, cell: int, symmetric: bool = True) -> dict[int, int]:
+        """Turn cell black if it is white and white if it is black. If symmetric is True
+        the cell opposite it under 180 degree rotation is set to match.
+        Returns a map of old to new clue index for each entry that survived the edit
+        but was renumbered. Removed entries are dropped from clues and new ones are
+        given empty clues.
+        """
+        n = self.width * self.height
+        cells = {cell, n - 1 - cell} if symmetric else {cell}
+        black = not self._mask[cell]
+        for c in cells:
+            self._mask[c] = black
+            self._chars[c] = BLACKSQUARE if black else BLANKSQUARE
+        self._cell_indexes.clear()
+
+        # rescan the rows and columns through the toggled cells
+        changed: set[int] = set()  # cells where an entry started or stopped starting
+        resized: list[tuple[str, int, int]] = []
+        for direction in ('across', 'down'):
+            lengths = self._lengths[direction]
+            lines = {c // self.width for c in cells} if direction == 'across' else {c % self.width for c in cells}
+            for line in lines:
+                old = {start: lengths.pop(start) for start in self._line_cells(direction, line) if start in lengths}
+                new = self._scan_line(direction, line)
+                lengths.update(new)
+                changed.update(old.keys() ^ new.keys())
+                resized.extend((direction, start, new[start]) for start in old.keys() & new.keys() if old[start] != new[start])
+                starts = self._starts[direction]
+                for start in old.keys() - new.keys():
+                    del starts[bisect.bisect_left(starts, start)]
+                for start in new.keys() - old.keys():
+                    bisect.insort(starts, start)
+
+        for start in changed:
+            index = bisect.bisect_left(self._numbered, start)
+            numbered = index < len(self._numbered) and self._numbered[index] == start
+            if numbered and start not in self._lengths['across'] and start not in self._lengths['down']:
+                del self._numbered[index]
+            elif not numbered:
+                self._numbered.insert(index, start)
+        moves = self._renumber(min(changed), max(changed)) if changed else {}
+
+        # entries whose start didn't change keep their place in the lists but may change length
+        for direction, start, length in resized:
+            self._entries(direction)[bisect.bisect_left(self._starts[direction], start)]['len'] = length
+        return moves
+
+    def _line_cells(self, direction: str, line: int) -> range:
+        if direction == 'across':
+            return range(line * self.width, (line + 1) * self.width)
+        return range(line, self.width * self.height, self.width)
+
+    def _scan_line(self, direction: str, line: int) -> dict[int, int]:
+        # start cell and length of the entries in a row or column
+        if direction == 'across':
+            runs = _WHITE_RUN.finditer(self._mask, line * self.width, (line + 1) * self.width)
+            return {run.start(): run.end() - run.start() for run in runs}
+        runs = _WHITE_RUN.finditer(self._mask[line::self.width])
+        return {run.start() * self.width + line: run.end() - run.start() for run in runs}
+
+    def _renumber(self, first: int, last: int) -> dict[int, int]:
+        # entries before the first changed start cell keep their numbers, and entries after
+        # the last one keep their order, so only the ones in between are rebuilt
+        numbered = self._numbered
+        k, end = bisect.bisect_left(numbered, first), bisect.bisect_right(numbered, last)
+        ia = ja = bisect.bisect_left(self._starts['across'], first)
+        id_ = jd = bisect.bisect_left(self._starts['down'], first)
+        old: dict[tuple[int, str], ClueEntry] = {}
+        while ja < len(self.across) and self.across[ja]['cell'] <= last:
+            old[self.across[ja]['cell'], 'across'] = self.across[ja]
+            ja += 1
+        while jd < len(self.down) and self.down[jd]['cell'] <= last:
+            old[self.down[jd]['cell'], 'down'] = self.down[jd]
+            jd += 1
+
+        moves: dict[int, int] = {}
+        across: list[ClueEntry] = []
+        down: list[ClueEntry] = []
+        clues: list[str] = []
+        count = ia + id_
+        for num, i in enumerate(numbered[k:end], k + 1):
+            row, col = divmod(i, self.width)
+            for direction, entries in (('across', across), ('down', down)):
+                length = self._lengths[direction].get(i)
+                if length is None:
+                    continue
+                entry = old.get((i, direction))
+                if entry is None:
+                    entry = ClueEntry({
+                        'num': num,
+                        'clue': '',
+                        'clue_index': count,
+                        'cell': i,
+                        'row': row,
+                        'col': col,
+                        'len': length,
+                        'dir': direction,
+                    })
+                elif entry['clue_index'] != count:
+                    moves[entry['clue_index']] = count
+                    entry['num'], entry['clue_index'] = num, count
+                else:
+                    entry['num'] = num
+                entries.append(entry)
+                clues.append(entry['clue'])
+                count += 1
+        self.clues[ia + id_:ja + jd] = clues
+        self.across[ia:ja], self.down[id_:jd] = across, down
+
+        # the rest only shift by the number of starts and entries added or removed
+        tail = self.across[ia + len(across):] + self.down[id_ + len(down):]
+        if tail:
+            shift_num = end - k - len({cell for cell, _ in old})
+            shift_index = count - ja - jd
+            if shift_index:
+                moves.update((entry['clue_index'], entry['clue_index'] + shift_index) for entry in tail)
+            for entry in tail:
+                entry['num'] += shift_num
+                entry['clue_index'] += shift_index
+        return moves
+
+
+class ClueTable:
+    """Clue numbering for a grid stored column-wise in arrays rather than as one dict
+    per entry, for holding the numbering of many puzzles in memory at once. Rows are
+    the across entries followed by the down entries. Indexing or iterating the table
+    hands out ClueView objects that read from the columns and support the same
+    access as ClueEntry (e.g. entry['num'] or entry.number).
+    """
+    DIRECTIONS = ('across', 'down')
+
+    def __repr__(self) -> str:
+        return f'ClueTable(across={self.across_count}, down={len(self) - self.across_count})'
+
+    def __init__(self, grid: str, clues: list[str], width: int, height: int, puzzle: Puzzle | None = None) -> None:
+        self.clues = clues
+        self.width = width
+        self.height = height
+        self._puzzle = puzzle
+
+        across, down = _numbering_skeleton(width, height, _black_mask(grid, BLACKSQUARE + BLACKSQUARE2))
+        entries = across + down
+        self.across_count = len(across)
+        self.num = array.array('H', [entry['num'] for entry in entries])
+        self.cell = array.array('H', [entry['cell'] for entry in entries])
+        self.row = array.array('B', [entry['row'] for entry in entries])
+        self.col = array.array('B', [entry['col'] for entry in entries])
+        self.len = array.array('B', [entry['len'] for entry in entries])
+        self.dir = array.array('B', bytes(len(across)) + b'\1' * len(down))
+        self.clue_index = array.array('H', [entry['clue_index'] for entry in entries])
+
+    def __len__(self) -> int:
+        return len(self.num)
+
+    def __getitem__(self, index: int) -> ClueView:
+        if not -len(self) <= index < len(self):
+            raise IndexError('ClueTable index out of range')
+        return ClueView(self, index % len(self))
+
+    def __iter__(self) -> Iterator[ClueView]:
+        return (ClueView(self, index) for index in range(len(self)))
+
+    def __sizeof__(self) -> int:
+        # the clue strings themselves belong to the puzzle
+        columns = (self.num, self.cell, self.row, self.col, self.len, self.dir, self.clue_index)
+        return object.__sizeof__(self) + sum(column.__sizeof__() for column in columns)
+
+    @property
+    def across(self) -> list[ClueView]:
+        return [ClueView(self, index) for index in range(self.across_count)]
+
+    @property
+    def down(self) -> list[ClueView]:
+        return [ClueView(self, index) for index in range(self.across_count, len(self))]
+
+
+class ClueView(Mapping[str, Any]):
+    """One row of a ClueTable, readable like a ClueEntry"""
+    __slots__ = ('_index', '_table')
+
+    _KEYS = ('num', 'clue', 'clue_index', 'cell', 'row', 'col', 'len', 'dir')
+
+    def __init__(self, table: ClueTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __repr__(self) -> str:
+        return f'ClueView({dict(self)!r})'
+
+    def __getitem__(self, key: str) -> Any:
+        table, index = self._table, self._index
+        if key == 'clue':
+            return table.clues[table.clue_index[index]]
+        if key == 'dir':
+            return ClueTable.DIRECTIONS[table.dir[index]]
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(table, key)[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    @property
+    def number(self) -> int:
+        return self._table.num[self._index]
+
+    @property
+    def text(self) -> str:
+        return cast(str, self['clue'])
+
+    @property
+    def length(self) -> int:
+        return self._table.len[self._index]
+
+    @property
+    def direction(self) -> str:
+        return ClueTable.DIRECTIONS[self._table.dir[self._index]]
+
+    @property
+    def row(self) -> int:
+        return self._table.row[self._index]
+
+    @property
+    def col(self) -> int:
+        return self._table.col[self._index]
+
+    @property
+    def cell(self) -> int:
+        return self._table.cell[self._index]
+
+    @property
+    def solution(self) -> str:
+        puzzle = self._table._puzzle
+        assert puzzle is not None, 'ClueTable has no puzzle reference'
+        return puzzle.solution_grid().get_string_for_clue(self)
+
+    @property
+    def fill(self) -> str:
+        puzzle = self._table._puzzle
+        assert puzzle is not None, 'ClueTable has no puzzle reference'
+        return puzzle.grid().get_string_for_clue(self)
+
+
 class Grid:
     def __repr__(self) -> str:
         return f'Grid({self.width}x{self.height})'
@@ -718,19 +1787,15 @@ class Grid:
         return row * self.width + col
 
     def get_range(self, row: int, col: int, length: int, dir: str = 'across') -> list[str]:  # noqa: A002
-        if dir == 'across':
-            return self.get_range_across(row, col, length)
-        if dir == 'down':
-            return self.get_range_down(row, col, length)
-        raise AssertionError("dir not one of 'across' or 'down'")
+        return list(self.get_string(row, col, length, dir))
 
     def get_range_across(self, row: int, col: int, length: int) -> list[str]:
-        return [self.grid[self.get_cell_index(row, col + i)] for i in range(length)]
+        return list(self.get_string_across(row, col, length))
 
     def get_range_down(self, row: int, col: int, length: int) -> list[str]:
-        return [self.grid[self.get_cell_index(row + i, col)] for i in range(length)]
+        return list(self.get_string_down(row, col, length))
 
-    def get_range_for_clue(self, clue: ClueEntry) -> list[str]:
+    def get_range_for_clue(self, clue: Mapping[str, Any]) -> list[str]:
         return self.get_range(clue['row'], clue['col'], clue['len'], clue['dir'])
 
     def __iter__(self) -> Iterator[list[str]]:
@@ -751,16 +1816,90 @@ class Grid:
         return self.get_range_down(0, col, self.height)
 
     def get_string(self, row: int, col: int, length: int, dir: str = 'across') -> str:  # noqa: A002
-        return ''.join(self.get_range(row, col, length, dir))
+        cells = self._cells(row, col, length, dir)
+        return self.grid[cells.start:cells.stop:cells.step]
 
     def get_string_across(self, row: int, col: int, length: int) -> str:
-        return ''.join(self.get_range_across(row, col, length))
+        return self.get_string(row, col, length, 'across')
 
     def get_string_down(self, row: int, col: int, length: int) -> str:
-        return ''.join(self.get_range_down(row, col, length))
+        return self.get_string(row, col, length, 'down')
+
+    def get_string_for_clue(self, clue: Mapping[str, Any]) -> str:
+        return self.get_string(clue['row'], clue['col'], clue['len'], clue['dir'])
+
+    def view(self, row: int, col: int, length: int, dir: str = 'across') -> GridView:  # noqa: A002
+        """Like get_range, but the cells are read from the grid as they are accessed"""
+        return GridView(self.grid, self._cells(row, col, length, dir))
+
+    def row_views(self) -> Iterator[GridView]:
+        """Like rows, but yields a GridView of each row"""
+        for row in range(self.height):
+            yield self.view(row, 0, self.width)
+
+    def col_views(self) -> Iterator[GridView]:
+        """Like cols, but yields a GridView of each column"""
+        for col in range(self.width):
+            yield self.view(0, col, self.height, 'down')
+
+    def _cells(self, row: int, col: int, length: int, dir: str) -> range:  # noqa: A002
+        # the indexes of a run of cells, which must all be in the grid
+        start = self.get_cell_index(row, col)
+        if dir == 'across':
+            cells = range(start, start + length)
+        elif dir == 'down':
+            cells = range(start, start + length * self.width, self.width)
+        else:
+            raise AssertionError("dir not one of 'across' or 'down'")
+        if cells and not (start >= 0 and cells[-1] < len(self.grid)):
+            raise IndexError('grid index out of range')
+        return cells
 
-    def get_string_for_clue(self, clue: ClueEntry) -> str:
-        return ''.join(self.get_range_for_clue(clue))
+
+class GridView(Sequence[str]):
+    """A run of cells in a grid string, read by slicing the string rather than
+    copying the cells into a list. str() gives the cells as a string.
+    """
+    __slots__ = ('_cells', '_grid')
+
+    def __init__(self, grid: str, cells: range) -> None:
+        self._grid = grid
+        self._cells = cells
+
+    def __repr__(self) -> str:
+        return f'GridView({str(self)!r})'
+
+    def __str__(self) -> str:
+        cells = self._cells
+        if cells.step < 0:
+            return ''.join(self)
+        return self._grid[cells.start:cells.stop:cells.step]
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> GridView: ...
+
+    def __getitem__(self, index: int | slice) -> str | GridView:
+        if isinstance(index, slice):
+            return GridView(self._grid, self._cells[index])
+        return self._grid[self._cells[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._grid.__getitem__, self._cells)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, GridView):
+            return str(self) == str(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
 
 
 class Rebus(PuzzleHelper):
@@ -955,6 +2094,95 @@ class Markup(PuzzleHelper):
             self.puzzle.extensions.pop(Extensions.Markup, None)
 
 
+class FillEditor(PuzzleHelper):
+    """Edits the fill one cell at a time without rebuilding the fill string on every
+    change. Edits are kept in a list and the fill string is only rebuilt the next time
+    puzzle.fill is read (or the puzzle is saved), however many cells have changed.
+    Assigning puzzle.fill directly discards edits that have not been read back.
+    Cells that are rebus squares take their full text, which goes in the Rebus fill
+    table with its first letter in the fill.
+    """
+    def __repr__(self) -> str:
+        return f'FillEditor(dirty={self._dirty})'
+
+    def __init__(self, puzzle: Puzzle) -> None:
+        self.puzzle = puzzle
+        self._dirty = False
+        self._reload()
+
+    @property
+    def fill(self) -> str:
+        self.save()
+        return self._fill
+
+    def get_cell(self, row: int, col: int) -> str:
+        """The contents of a cell, including the full text of a rebus square"""
+        index = self._index(row, col)
+        self._sync()
+        rebus = self._rebus()
+        return (rebus and rebus.get_rebus_fill(index)) or self._cells[index]
+
+    def set_cell(self, row: int, col: int, ch: str) -> None:
+        """Fill a cell; an empty string or BLANKSQUARE clears it"""
+        self._set(self._index(row, col), ch)
+
+    def set_entry(self, entry: Mapping[str, Any], text: str | Sequence[str]) -> None:
+        """Fill every cell of a clue entry, one letter (or one string per rebus square) each"""
+        cells = self._entry_cells(entry)
+        if len(text) != len(cells):
+            raise ValueError(f"text must fill the {len(cells)} cells of {entry['num']} {entry['dir']}")
+        for index, ch in zip(cells, text):
+            self._set(index, ch)
+
+    def clear_entry(self, entry: Mapping[str, Any]) -> None:
+        for index in self._entry_cells(entry):
+            self._set(index, BLANKSQUARE)
+
+    def save(self) -> None:
+        self._sync()
+        if self._dirty:
+            self._fill = self.puzzle._fill = ''.join(self._cells)
+            self._dirty = False
+
+    def _reload(self) -> None:
+        self._fill = self.puzzle._fill
+        self._cells = list(self._fill)
+        self._dirty = False
+
+    def _sync(self) -> None:
+        # start over from puzzle.fill if it has been assigned since it was read
+        if self.puzzle._fill is not self._fill:
+            self._reload()
+
+    def _rebus(self) -> Rebus | None:
+        # only load the rebus helper for puzzles that have one
+        if 'rebus' in self.puzzle.helpers or Extensions.Rebus in self.puzzle.extensions:
+            return self.puzzle.rebus()
+        return None
+
+    def _index(self, row: int, col: int) -> int:
+        if not (0 <= row < self.puzzle.height and 0 <= col < self.puzzle.width):
+            raise IndexError(f'cell ({row}, {col}) is outside the grid')
+        return row * self.puzzle.width + col
+
+    def _entry_cells(self, entry: Mapping[str, Any]) -> range:
+        step = 1 if entry['dir'] == 'across' else self.puzzle.width
+        return range(entry['cell'], entry['cell'] + entry['len'] * step, step)
+
+    def _set(self, index: int, ch: str) -> None:
+        self._sync()
+        if is_blacksquare(self._cells[index]):
+            raise ValueError(f'cell {index} is a black square')
+        rebus = self._rebus()
+        is_rebus = rebus is not None and rebus.is_rebus_square(index)
+        if len(ch) > 1 and not is_rebus:
+            raise ValueError(f'cell {index} is not a rebus square and can only hold one letter')
+        if rebus is not None and is_rebus:
+            rebus.set_rebus_fill(index, ch if len(ch) > 1 else '')
+        self._cells[index] = ch[:1] or BLANKSQUARE
+        self._dirty = True
+
+
 class TimerStatus(IntEnum):
     Running = 0
     Stopped = 1
@@ -983,18 +2211,31 @@ class Timer(PuzzleHelper):
 
 
 # helper functions for cksums and scrambling
-def data_cksum(data: bytes, cksum: int = 0) -> int:
-    for b in data:
-        # right-shift one with wrap-around
-        lowbit = (cksum & 0x0001)
-        cksum = (cksum >> 1)
-        if lowbit:
-            cksum = (cksum | 0x8000)
 
-        # then add in the data and clear any carried bit past 16
-        cksum = (cksum + b) & 0xffff
+# Each step of the checksum is "rotate right by one bit, then add the byte". Rather than
+# rotating and masking per byte, we look the rotation up in a table indexed by the
+# unmasked running sum: a 16-bit value plus one byte never exceeds 0xffff + 0xff, so
+# the table covers every intermediate value and masking can be done once at the end.
+# The table is built on first use.
+_cksum_rotate_table: list[int] = []
 
-    return cksum
+
+def _get_cksum_rotate_table() -> list[int]:
+    if not _cksum_rotate_table:
+        rotated = [(c >> 1) | ((c & 0x0001) << 15) for c in range(0x10000)]
+        _cksum_rotate_table.extend(rotated + rotated[:0xff])
+    return _cksum_rotate_table
+
+
+def data_cksum(data: bytes | bytearray | memoryview, cksum: int = 0) -> int:
+    rotate = _get_cksum_rotate_table()
+    cksum &= 0xffff
+    for b in data:
+        # right-shift one with wrap-around, then add in the data
+        cksum = rotate[cksum] + b
+
+    # clear any carried bit past 16
+    return cksum & 0xffff
 
 
 def replace_chars(s: str, chars: str, replacement: str = '') -> str:
@@ -1004,6 +2245,8 @@ def replace_chars(s: str, chars: str, replacement: str = '') -> str:
 
 
 def scramble_solution(solution: str, width: int, height: int, key: int, ignore_chars: str = BLACKSQUARE) -> str:
+    if len(solution) == width * height:
+        return _scramble_plan(width, height, _black_mask(solution, ignore_chars), key).apply(solution)
     sq = square(solution, width, height)
     data = restore(sq, scramble_string(replace_chars(sq, ignore_chars), key))
     return square(data, height, width)
@@ -1032,6 +2275,8 @@ def scramble_string(s: str, key: int) -> str:
 
 
 def unscramble_solution(scrambled: str, width: int, height: int, key: int, ignore_chars: str = BLACKSQUARE) -> str:
+    if len(scrambled) == width * height:
+        return _scramble_plan(width, height, _black_mask(scrambled, ignore_chars), key, reverse=True).apply(scrambled)
     # width and height are reversed here
     sq = square(scrambled, width, height)
     data = restore(sq, unscramble_string(replace_chars(sq, ignore_chars), key))
@@ -1050,27 +2295,194 @@ def unscramble_string(s: str, key: int) -> str:
 
 
 def scrambled_cksum(scrambled: str, width: int, height: int, ignore_chars: str = BLACKSQUARE, encoding: str = ENCODING) -> int:
-    data = replace_chars(square(scrambled, width, height), ignore_chars)
+    if len(scrambled) == width * height:
+        cells = _column_major_cells(width, height, _black_mask(scrambled, ignore_chars))
+        data = ''.join(map(scrambled.__getitem__, cells))
+    else:
+        data = replace_chars(square(scrambled, width, height), ignore_chars)
     return data_cksum(data.encode(encoding, ENCODING_ERRORS))
 
 
+class _ScramblePlan:
+    """scramble_solution or unscramble_solution for one grid layout and key, reduced
+    to a single gather plus a shift per cell: cell i of the result is cell gather[i]
+    of the input, moved through the alphabet by the shift encoded in offsets[i].
+    Black squares gather themselves and are left as they are. Both are kept as arrays
+    rather than lists of ints, which would take several MB per plan on large grids.
+    """
+    __slots__ = ('gather', 'offsets')
+
+    def __init__(self, gather: array.array[int], offsets: array.array[int]) -> None:
+        self.gather = gather
+        self.offsets = offsets
+
+    def apply(self, s: str) -> str:
+        data = s.encode('ascii')
+        try:
+            return bytes(map(_SHIFTED_BYTES.__getitem__,
+                             map(operator.add, map(data.__getitem__, self.gather), self.offsets))).decode('ascii')
+        except ValueError:
+            raise ValueError('only the letters A-Z can be scrambled') from None
+
+
+# a shift of n places is looked up at offset 256 * n; the final block leaves every byte as is
+_BLACK_OFFSET = 256 * 26
+_SHIFTED_BYTES = [
+    (ord('A') + (b - ord('A') + n) % 26 if ord('A') <= b <= ord('Z') else -1) if n < 26 else b
+    for n in range(27) for b in range(256)
+]
+
+
+def _black_mask(s: str, ignore_chars: str) -> bytes:
+    # the positions of black squares in s, as a byte string usable as a cache key
+    return s.encode('ascii', 'replace').translate(_black_mask_table(ignore_chars))
+
+
+@functools.lru_cache(maxsize=16)
+def _black_mask_table(ignore_chars: str) -> bytes:
+    return bytes(chr(b) in ignore_chars for b in range(256))
+
+
+@functools.lru_cache(maxsize=16)
+def _column_major_cells(width: int, height: int, mask: bytes) -> array.array[int]:
+    # the order that scrambling and the scrambled checksum visit cells in: column by column, skipping black squares
+    return array.array('I', [r * width + c for c in range(width) for r in range(height) if not mask[r * width + c]])
+
+
+# checking and unlocking a puzzle use one key, so only the most recent few are kept
+@functools.lru_cache(maxsize=16)
+def _scramble_plan(width: int, height: int, mask: bytes, key: int, reverse: bool = False) -> _ScramblePlan:
+    # replay scramble_string (or unscramble_string) on the positions of the cells
+    # rather than on their letters, keeping track of how far each has been shifted
+    cells = _column_major_cells(width, height, mask)
+    n = len(cells)
+    digits = key_digits(key)
+    pattern = (digits * (n // len(digits) + 1))[:n]
+    positions = list(range(n))
+    shifts = [0] * n
+    if not reverse:
+        for k in digits:
+            shifts = list(map(operator.add, shifts, pattern))
+            positions = _shuffle_list(positions[k:] + positions[:k])
+            shifts = _shuffle_list(shifts[k:] + shifts[:k])
+    else:
+        for k in digits[::-1]:
+            positions = positions[1::2] + positions[::2]
+            shifts = shifts[1::2] + shifts[::2]
+            positions = positions[n-k:] + positions[:n-k]
+            shifts = shifts[n-k:] + shifts[:n-k]
+            shifts = list(map(operator.sub, shifts, pattern))
+
+    gather = array.array('I', range(width * height))
+    offsets = array.array('H', [_BLACK_OFFSET]) * (width * height)
+    for cell, position, shift in zip(cells, positions, shifts):
+        gather[cell] = cells[position]
+        offsets[cell] = shift % 26 * 256
+    return _ScramblePlan(gather, offsets)
+
+
+def _shuffle_list(items: list[int]) -> list[int]:
+    # shuffle() for lists
+    mid = len(items) // 2
+    shuffled = items[:]
+    shuffled[0:2 * mid:2] = items[mid:2 * mid]
+    shuffled[1:2 * mid:2] = items[:mid]
+    return shuffled
+
+
+def find_key(puzzle: Puzzle, workers: int | None = 1, keys: Iterable[int] = range(1000, 10000)) -> tuple[int, str] | None:
+    """
+    Search for the key of a puzzle whose solution is locked. Keys are tried in order
+    against the puzzle's scrambled checksum, just as unlock_solution would, and the
+    first key that matches is returned along with the unlocked solution (the puzzle
+    itself is left locked). Returns None if no key matches.
+    The checksum is only 16 bits, so a wrong key can occasionally match as well.
+    With more than one worker the keys are split among a pool of processes;
+    workers=None uses one per CPU.
+    """
+    if not puzzle.is_solution_locked():
+        raise ValueError('puzzle solution is not locked')
+    scrambled = replace_chars(square(puzzle.solution, puzzle.width, puzzle.height), puzzle.blacksquare())
+    if any(c not in string.ascii_uppercase for c in scrambled):
+        raise ValueError('locked solution contains characters other than A-Z')
+    data = scrambled.encode('ascii')
+    keys = list(keys)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        key = _find_key_in(data, puzzle.scrambled_cksum, keys)
+    else:
+        # contiguous runs of keys, so that results come back in key order
+        chunksize = max(1, -(-len(keys) // (workers * 4)))
+        chunks = [keys[i:i + chunksize] for i in range(0, len(keys), chunksize)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_find_key_in, [data] * len(chunks), [puzzle.scrambled_cksum] * len(chunks), chunks)
+            key = next((k for k in results if k is not None), None)
+            executor.shutdown(cancel_futures=True)
+
+    if key is None:
+        return None
+    return key, unscramble_solution(puzzle.solution, puzzle.width, puzzle.height, key, ignore_chars=puzzle.blacksquare())
+
+
+def _find_key_in(scrambled: bytes, cksum: int, keys: list[int]) -> int | None:
+    for key in keys:
+        if data_cksum(_unscramble_bytes(scrambled, key)) == cksum:
+            return key
+    return None
+
+
+# tables for moving a letter d places back through the alphabet, see _unscramble_bytes
+_UNSHIFT_TABLES = [
+    bytes.maketrans(string.ascii_uppercase.encode(), (string.ascii_uppercase[-d:] + string.ascii_uppercase[:-d]).encode())
+    for d in range(10)
+]
+
+
+def _unscramble_bytes(s: bytes, key: int) -> bytearray:
+    """
+    Equivalent to unscramble_string for ASCII letters, but working on bytes so that
+    every step is a slice or a translate: unshifting position i by digit i % 4 is
+    four translates of the strided slices s[j::4].
+    """
+    digits = key_digits(key)
+    tables = [_UNSHIFT_TABLES[k] for k in digits]
+    l = len(s)  # noqa: E741
+    data = bytearray(s)
+    for k in digits[::-1]:
+        data = data[1::2] + data[::2]
+        data = data[l-k:] + data[:l-k]
+        for j, table in enumerate(tables):
+            data[j::len(tables)] = data[j::len(tables)].translate(table)
+    return data
+
+
 def key_digits(key: int) -> list[int]:
     return [int(c) for c in str(key).zfill(4)]
 
 
 def square(data: str, w: int, h: int) -> str:
-    aa = [data[i:i+w] for i in range(0, len(data), w)]
-    return ''.join(
-        [''.join([aa[r][c] for r in range(h)]) for c in range(w)]
-    )
+    # column c of a row-major grid is every w-th char starting at c
+    if len(data) < w * h:
+        raise IndexError('grid data is shorter than its dimensions')
+    return ''.join(data[c:w * h:w] for c in range(w))
 
 
 def shift(s: str, key: list[int]) -> str:
+    # char i is shifted by key[i % len(key)], so each strided slice shifts by one amount
+    if s and not (s.isascii() and s.isalpha() and s.isupper()):
+        raise ValueError('only the letters A-Z can be shifted')
+    chars = list(s)
+    for i, k in enumerate(key):
+        chars[i::len(key)] = s[i::len(key)].translate(_shift_table(k % 26))
+    return ''.join(chars)
+
+
+@functools.lru_cache(maxsize=26)
+def _shift_table(n: int) -> dict[int, int]:
     atoz = string.ascii_uppercase
-    return ''.join(
-        atoz[(atoz.index(c) + key[i % len(key)]) % len(atoz)]
-        for i, c in enumerate(s)
-    )
+    return str.maketrans(atoz, atoz[n:] + atoz[:n])
 
 
 def unshift(s: str, key: list[int]) -> str:
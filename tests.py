@@ -1,8 +1,13 @@
 import glob
+import io
+import mmap
 import os
 import pathlib
+import pickle
+import random
 import sys
 import tempfile
+from typing import Any
 
 import pytest
 
@@ -130,6 +135,40 @@ def test_grid() -> None:
     assert sol_grid.grid == p.solution
 
 
+def test_clue_numbering_cell_index() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    clues = p.clue_numbering()
+
+    for direction, entries in (('across', clues.across), ('down', clues.down)):
+        covered = set()
+        for entry in entries:
+            cells = clues.cells_of(entry)
+            assert len(cells) == entry.length
+            assert ''.join(p.solution[i] for i in cells) == entry.solution
+            for position, cell in enumerate(cells):
+                assert clues.entry_at(cell, direction) is entry
+                assert clues.position_in_entry(cell, direction) == position
+            covered.update(cells)
+        for cell in set(range(p.width * p.height)) - covered:
+            assert clues.entry_at(cell, direction) is None
+            assert clues.position_in_entry(cell, direction) is None
+
+    # 1-Down (LOFT) runs through cell 15
+    assert clues.entry_at(15, 'down') is clues.down[0]
+    assert clues.position_in_entry(15, 'down') == 1
+
+    # next and prev step through a direction and on into the other one
+    assert clues.next_entry(clues.across[0]) is clues.across[1]
+    assert clues.prev_entry(clues.across[1]) is clues.across[0]
+    assert clues.next_entry(clues.across[-1]) is clues.down[0]
+    assert clues.next_entry(clues.down[-1]) is clues.across[0]
+    assert clues.prev_entry(clues.across[0]) is clues.down[-1]
+    assert clues.prev_entry(clues.down[0]) is clues.across[-1]
+
+    with pytest.raises(AssertionError):
+        clues.entry_at(0, 'diagonal')
+
+
 def test_diagramless_clue_numbering() -> None:
     p = puz.read('testfiles/nyt_diagramless.puz')
     clues = p.clue_numbering()
@@ -137,6 +176,326 @@ def test_diagramless_clue_numbering() -> None:
     assert len(p.clues) > 0
 
 
+def _reference_grid_numbering(grid: str, width: int, height: int) -> list[tuple[int, int, int, str]]:
+    # (num, cell, len, dir) of each entry, in clue order, by walking the grid cell by cell
+    def run(i: int, step: int, steps: int) -> int:
+        n = 0
+        while n < steps and not puz.is_blacksquare(grid[i + n * step]):
+            n += 1
+        return n
+
+    entries: list[tuple[int, int, int, str]] = []
+    num = 1
+    for i in range(width * height):
+        row, col = divmod(i, width)
+        if puz.is_blacksquare(grid[i]):
+            continue
+        started = False
+        if (col == 0 or puz.is_blacksquare(grid[i - 1])) and run(i, 1, width - col) > 1:
+            entries.append((num, i, run(i, 1, width - col), 'across'))
+            started = True
+        if (row == 0 or puz.is_blacksquare(grid[i - width])) and run(i, width, height - row) > 1:
+            entries.append((num, i, run(i, width, height - row), 'down'))
+            started = True
+        num += started
+    return entries
+
+
+def test_grid_numbering_matches_reference() -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        width, height = rng.randint(1, 12), rng.randint(1, 12)
+        grid = ''.join(rng.choice('ABC-é.:') for _ in range(width * height))
+        across, down = puz.get_grid_numbering(grid, width, height)
+        entries = sorted(across + down, key=lambda e: e['clue_index'])
+        assert [e['clue_index'] for e in entries] == list(range(len(entries)))
+        assert [(e['num'], e['cell'], e['len'], e['dir']) for e in entries] == \
+            _reference_grid_numbering(grid, width, height)
+        for e in entries:
+            assert (e['row'], e['col']) == divmod(e['cell'], width)
+
+
+def test_numbering_cache() -> None:
+    maxsize = puz.numbering_cache_info().maxsize
+    try:
+        puz.set_numbering_cache_size(2)
+        p = puz.read('testfiles/washpost.puz')
+        across, _ = puz.get_grid_numbering(p.fill, p.width, p.height)
+        assert puz.numbering_cache_info().misses == 1
+
+        # the solution has the same black squares as the fill
+        clues = p.clue_numbering()
+        info = puz.numbering_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+        assert clues.across == [dict(e, clue=p.clues[e['clue_index']]) for e in across]
+
+        # every call gets entries of its own
+        clues.across[0]['clue'] = 'changed'
+        assert puz.get_grid_numbering(p.fill, p.width, p.height)[0][0]['clue'] is None
+
+        puz.set_numbering_cache_size(0)
+        puz.get_grid_numbering(p.fill, p.width, p.height)
+        puz.get_grid_numbering(p.fill, p.width, p.height)
+        info = puz.numbering_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (0, 2, 0)
+    finally:
+        puz.set_numbering_cache_size(maxsize)
+
+
+def test_editable_numbering() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    numbering = puz.EditableNumbering(p.solution, p.clues, p.width, p.height)
+    clues = {(e['cell'], e['dir']): e['clue'] for e in numbering.across + numbering.down}
+
+    rng = random.Random(0)
+    for _ in range(20):
+        before = {(e['cell'], e['dir']): e['clue_index'] for e in numbering.across + numbering.down}
+        moves = numbering.toggle_block(rng.randrange(p.width * p.height))
+
+        # the same numbering as starting over, with clues following their entries
+        across, down = puz.get_grid_numbering(numbering.grid, p.width, p.height)
+        assert numbering.across == [dict(e, clue=clues.get((e['cell'], e['dir']), '')) for e in across]
+        assert numbering.down == [dict(e, clue=clues.get((e['cell'], e['dir']), '')) for e in down]
+        assert numbering.clues == [e['clue'] for e in sorted(numbering.across + numbering.down,
+                                                             key=lambda e: e['clue_index'])]
+        after = {(e['cell'], e['dir']): e['clue_index'] for e in numbering.across + numbering.down}
+        assert moves == {before[k]: after[k] for k in before.keys() & after.keys() if before[k] != after[k]}
+        clues = {k: numbering.clues[i] for k, i in after.items()}
+
+    # blocking the second cell of 1-Across removes it and 2-Down, and the symmetric cell
+    # removes two more from the end; the remaining clues shift down
+    numbering = puz.EditableNumbering(p.solution, p.clues, p.width, p.height)
+    moves = numbering.toggle_block(1)
+    assert numbering.grid[:5] == 'L.MB.'
+    assert numbering.grid[-2] == '.'
+    assert moves == {1: 0, **{i: i - 1 for i in range(3, 17)}}
+    assert numbering.clues[:3] == [p.clues[1], '', p.clues[3]]
+    assert numbering.entry_at(2, 'across') == numbering.across[0]
+
+    # unblocking it brings the entries back without their old clues
+    moves = numbering.toggle_block(1, symmetric=False)
+    assert numbering.grid[:5] == 'L-MB.'
+    assert numbering.grid[-2] == '.'
+    assert moves == {0: 1, **{i: i + 1 for i in range(2, 16)}}
+    assert numbering.clues[:3] == ['', p.clues[1], '']
+    assert p.clues == puz.read('testfiles/washpost.puz').clues
+
+
+def test_clue_table() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    table = p.clue_table()
+    numbering = p.clue_numbering()
+    assert (table.across_count, len(table)) == (37, 78)
+    assert table.across == numbering.across
+    assert table.down == numbering.down
+    assert list(table) == numbering.across + numbering.down
+
+    entry = table[-1]
+    expected = numbering.down[-1]
+    assert entry == table.down[-1]
+    assert (entry['num'], entry['dir'], entry['clue']) == (expected['num'], 'down', expected['clue'])
+    assert (entry.number, entry.text, entry.length, entry.direction) == \
+        (expected.number, expected.text, expected.length, expected.direction)
+    assert (entry.row, entry.col, entry.cell) == (expected.row, expected.col, expected.cell)
+    assert (entry.solution, entry.fill) == (expected.solution, expected.fill)
+    assert not hasattr(entry, '__dict__')
+    with pytest.raises(KeyError):
+        entry['missing']
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+    # clue text is read from the puzzle's list
+    p.clues[entry['clue_index']] = 'changed'
+    assert entry.text == 'changed'
+    assert sys.getsizeof(table) * 10 < sum(sys.getsizeof(e) for e in numbering.across + numbering.down)
+
+    detached = puz.ClueTable(p.solution, p.clues, p.width, p.height)
+    with pytest.raises(AssertionError, match='no puzzle reference'):
+        _ = detached[0].solution
+
+
+def test_answers_and_fills() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    clues = p.clue_numbering()
+    entries = sorted(clues.across + clues.down, key=lambda e: e['clue_index'])
+    assert p.answers() == [e.solution for e in entries]
+    assert p.fills() == [e.fill for e in entries]
+    assert p.answers()[0] == 'LAMB'
+    assert len(p.answers()) == len(p.clues)
+
+    # the grids are reused until the fields are reassigned
+    grid = p.grid()
+    assert p.grid() is grid
+    assert p.solution_grid() is p.solution_grid()
+    p.fill = 'LAMB' + p.fill[4:]
+    assert p.grid() is not grid
+    assert p.grid().grid == p.fill
+    assert p.fills()[0] == clues.across[0].fill == 'LAMB'
+
+    # answers() goes through the numbering cache, and so follows its settings
+    maxsize = puz.numbering_cache_info().maxsize
+    try:
+        puz.set_numbering_cache_size(0)
+        assert p.answers() == [e.solution for e in entries]
+        assert puz.numbering_cache_info().misses == 1
+        puz.set_numbering_cache_size(2)
+        p.answers()
+        p.fills()
+        assert (puz.numbering_cache_info().hits, puz.numbering_cache_info().misses) == (1, 1)
+    finally:
+        puz.set_numbering_cache_size(maxsize)
+
+
+def test_grid_views() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    soln = p.solution_grid()
+
+    view = soln.view(0, 0, 4)
+    assert str(view) == 'LAMB'
+    assert view == ['L', 'A', 'M', 'B'] == soln.get_range(0, 0, 4)
+    assert (len(view), view[1], view[-1]) == (4, 'A', 'B')
+    assert str(view[1:3]) == 'AM'
+    assert str(view[::-1]) == 'BMAL'
+    assert str(soln.view(0, 0, 4, 'down')) == 'LOFT'
+    assert view != 'LAMB'
+    assert not hasattr(view, '__dict__')
+
+    assert [str(row) for row in soln.row_views()] == [''.join(row) for row in soln.rows()]
+    assert [list(col) for col in soln.col_views()] == list(soln.cols())
+
+    # runs that leave the grid are an error rather than being cut short
+    with pytest.raises(IndexError):
+        soln.get_range_down(p.height - 1, 0, 2)
+    with pytest.raises(IndexError):
+        soln.view(0, 0, p.width * p.height + 1)
+    with pytest.raises(AssertionError):
+        soln.view(0, 0, 4, 'diagonal')
+
+
+def _check_arrays(p: puz.Puzzle, arrays: puz.PuzzleArrays, cells: list[Any]) -> None:
+    # cells are the array values in row-major order
+    assert cells[0] == list(p.encode(p.solution))
+    assert cells[1] == list(p.encode(p.fill))
+    assert cells[2] == [int(puz.is_blacksquare(c)) for c in p.solution]
+    assert cells[3] == p.markup().markup
+    assert cells[4] == p.rebus().table
+    numbering = p.clue_numbering()
+    for entry in numbering.across + numbering.down:
+        numbers = cells[5] if entry.direction == 'across' else cells[6]
+        assert {numbers[cell] for cell in numbering.cells_of(entry)} == {entry.number}
+    assert cells[5].count(0) == cells[6].count(0) == cells[2].count(1)
+
+    q = puz.Puzzle()
+    q.from_arrays(arrays)
+    assert (q.width, q.height, q.solution, q.fill) == (p.width, p.height, p.solution, p.fill)
+    assert q.rebus().table == p.rebus().table
+    assert q.markup().markup == p.markup().markup
+
+    # the rebus solutions go with the table, through a save and load
+    assert arrays.rebus_solutions == p.rebus().solutions != {}
+    q.clues = p.clues
+    r = puz.load(q.tobytes())
+    squares = p.rebus().get_rebus_squares()
+    assert [r.rebus().get_rebus_solution(i) for i in squares] == [p.rebus().get_rebus_solution(i) for i in squares]
+    assert r.rebus().check_rebus_fill(strict=False)
+
+    with pytest.raises(ValueError, match=r'missing rebus solutions \[1\]'):
+        puz.Puzzle().from_arrays(arrays._replace(rebus_solutions={}))
+
+
+def test_to_arrays() -> None:
+    numpy = pytest.importorskip('numpy')
+    p = puz.read('testfiles/nyt_rebus_with_notes_and_shape.puz')
+    arrays = p.to_arrays()
+    grids = arrays[2:-1]
+    assert all(grid.shape == (p.height, p.width) for grid in grids)
+    assert [grid.dtype for grid in grids] == [numpy.uint8] * 5 + [numpy.uint32] * 2
+    _check_arrays(p, arrays, [grid.ravel().tolist() for grid in grids])
+
+    arrays.solution[0, 0] = ord('X')
+    p.from_arrays(arrays)
+    assert p.solution[0] == 'X'
+    with pytest.raises(ValueError, match='15x16 cells'):
+        p.from_arrays(arrays._replace(height=16))
+
+
+def test_to_arrays_without_numpy(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(sys.modules, 'numpy', None)
+    p = puz.read('testfiles/nyt_rebus_with_notes_and_shape.puz')
+    arrays = p.to_arrays()
+    grids = arrays[2:-1]
+    assert [grid.typecode for grid in grids] == ['B'] * 5 + ['I'] * 2
+    assert all(len(grid) == p.width * p.height for grid in grids)
+    _check_arrays(p, arrays, [grid.tolist() for grid in grids])
+
+    p.solution = p.solution[:-1] + '\u2603'
+    with pytest.raises(UnicodeEncodeError):
+        p.to_arrays()
+
+
+def test_fill_editor() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    p.fill = ''.join('.' if puz.is_blacksquare(c) else '-' for c in p.solution)
+    editor = p.editor()
+    assert p.editor() is editor
+    a1, d1 = p.clue_numbering().across[0], p.clue_numbering().down[0]
+
+    editor.set_entry(a1, 'LAMB')
+    editor.set_cell(1, 0, 'O')
+    # every reader of the fill sees the edits
+    assert p.fill.startswith('LAMB.')
+    assert editor.fill == p.fill
+    assert p.fill[p.width] == 'O'
+    assert editor.get_cell(0, 1) == 'A'
+    assert p.grid().get_cell(0, 0) == 'L'
+    assert p.fills()[0] == a1.fill == 'LAMB'
+    assert p.to_arrays().fill.ravel()[0] == ord('L')
+    editor.set_cell(0, 0, 'Z')
+    assert p.grid().get_cell(0, 0) == 'Z'
+    assert p.check_answers(p.fill, strict=False) is False
+
+    editor.set_entry(d1, ['L', 'O', 'F', 'T'])
+    editor.clear_entry(a1)
+    editor.set_cell(0, 0, '')
+    p2 = puz.load(p.tobytes())
+    assert p2.fill[:5] == '----.'
+    assert p2.fill[p.width::p.width][:3] == 'OFT'
+
+    with pytest.raises(ValueError, match='fill the 4 cells'):
+        editor.set_entry(a1, 'LAM')
+    with pytest.raises(ValueError, match='black square'):
+        editor.set_cell(0, 4, 'X')
+    with pytest.raises(ValueError, match='one letter'):
+        editor.set_cell(0, 0, 'LA')
+    with pytest.raises(IndexError):
+        editor.set_cell(0, p.width, 'X')
+
+    # assigning the fill directly replaces unsaved edits
+    editor.set_cell(0, 0, 'X')
+    p.fill = p.solution
+    assert editor.get_cell(0, 0) == 'L'
+    assert editor.fill == p.solution
+
+
+def test_fill_editor_rebus() -> None:
+    p = puz.read('testfiles/nyt_rebus_with_notes_and_shape.puz')
+    editor = p.editor()
+    row, col = divmod(22, p.width)
+    editor.set_cell(row, col, 'STAR')
+    assert editor.get_cell(row, col) == 'STAR'
+    assert editor.fill[22] == 'S'
+    assert p.rebus().get_rebus_fill(22) == 'STAR'
+
+    p2 = puz.load(p.tobytes())
+    assert p2.fill[22] == 'S'
+    assert p2.rebus().get_rebus_fill(22) == 'STAR'
+    assert p2.rebus().check_rebus_fill(22)
+
+    editor.set_cell(row, col, 'S')
+    assert p.rebus().get_rebus_fill(22) is None
+    assert editor.get_cell(row, col) == 'S'
+
+
 def test_is_blacksquare() -> None:
     assert puz.is_blacksquare('.')
     assert puz.is_blacksquare(':')
@@ -306,6 +665,156 @@ def test_checksum_errors() -> None:
         puz.load(bytes(bad))
 
 
+def _reference_data_cksum(data: bytes, cksum: int = 0) -> int:
+    # straightforward per-byte version of the checksum, as described in FileFormat.md
+    for b in data:
+        lowbit = cksum & 0x0001
+        cksum = cksum >> 1
+        if lowbit:
+            cksum = cksum | 0x8000
+        cksum = (cksum + b) & 0xffff
+    return cksum
+
+
+@pytest.mark.parametrize('filename', glob.glob('testfiles/*.puz'))
+def test_data_cksum_matches_reference_on_files(filename: str) -> None:
+    with open(filename, 'rb') as fp:
+        data = fp.read()
+    assert puz.data_cksum(data) == _reference_data_cksum(data)
+    for start in (0, 1, 0x7fff, 0x8000, 0xffff):
+        assert puz.data_cksum(data, start) == _reference_data_cksum(data, start)
+
+
+def test_data_cksum_matches_reference_on_random_data() -> None:
+    rng = random.Random(1234)
+    for n in [0, 1, 2, 3, 255, 256, 4096, *rng.sample(range(10000), 50)]:
+        data = bytes(rng.getrandbits(8) for _ in range(n))
+        start = rng.getrandbits(16)
+        assert puz.data_cksum(data, start) == _reference_data_cksum(data, start)
+    # worst case for carries: all bytes 0xff from a checksum of 0xffff
+    assert puz.data_cksum(b'\xff' * 1000, 0xffff) == _reference_data_cksum(b'\xff' * 1000, 0xffff)
+
+
+def test_cksum_cache_only_rechecksums_fill(monkeypatch: pytest.MonkeyPatch) -> None:
+    p = puz.read('testfiles/washpost.puz')
+    p.tobytes()
+
+    calls: list[bytes] = []
+    real_data_cksum = puz.data_cksum
+
+    def counting_data_cksum(data: bytes, cksum: int = 0) -> int:
+        calls.append(bytes(data))
+        return real_data_cksum(data, cksum)
+
+    monkeypatch.setattr(puz, 'data_cksum', counting_data_cksum)
+
+    # nothing changed since load, so every checksum comes from the cache
+    p.tobytes()
+    assert calls == []
+
+    # a solving session only changes the fill: the solution and header are not re-checksummed
+    p.fill = 'LAMB' + p.fill[4:]
+    data = p.tobytes()
+    assert p.encode(p.solution) not in calls
+    assert p.encode(p.fill) in calls
+    assert puz.load(data).fill == p.fill
+
+
+def test_cksum_cache_invalidation() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    p.tobytes()
+
+    # editing the clues list in place must not reuse the cached text checksum
+    p.clues[0] = 'A new clue'
+    p.title = 'A new title'
+    p2 = puz.load(p.tobytes())
+    assert p2.clues[0] == 'A new clue'
+    assert p2.title == 'A new title'
+
+    # neither must a change of version or encoding
+    p.set_version('2.0')
+    p.encoding = puz.ENCODING_UTF8
+    p.notes = '⚔️'
+    p3 = puz.load(p.tobytes())
+    assert p3.notes == '⚔️'
+
+
+def test_none_text_fields_save_as_empty() -> None:
+    p = puz.read('testfiles/washpost.puz')
+    p.title = None  # type: ignore[assignment]
+    p.notes = None  # type: ignore[assignment]
+    p.clues[0] = None  # type: ignore[call-overload]
+    p2 = puz.load(p.tobytes())
+    assert (p2.title, p2.notes, p2.clues[0]) == ('', '', '')
+    assert p2.global_cksum() == p.global_cksum()
+
+
+def test_tobytes_encodes_each_field_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    p = puz.read('testfiles/nyt_rebus_with_notes_and_shape.puz')
+    expected = p.tobytes()
+
+    # an unpickled copy starts without any cached encodings
+    p = pickle.loads(pickle.dumps(p))
+    encoded: list[str] = []
+    real_encode = puz.Puzzle.encode
+
+    def counting_encode(self: puz.Puzzle, s: str) -> bytes:
+        encoded.append(s)
+        return real_encode(self, s)
+
+    monkeypatch.setattr(puz.Puzzle, 'encode', counting_encode)
+
+    # solution, fill, title, author, copyright, clues and notes
+    assert p.tobytes() == expected
+    assert len(encoded) == 6 + len(p.clues)
+
+    encoded.clear()
+    assert p.tobytes() == expected
+    assert encoded == []
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_unmodified_puzzle_returns_original_bytes(lazy: bool) -> None:
+    with open('testfiles/nyt_rebus_with_notes_and_shape.puz', 'rb') as f:
+        data = f.read()
+    p = puz.load(data, lazy=lazy)
+    assert p.tobytes() is data
+    if lazy:
+        # without materializing any extensions
+        assert isinstance(p.extensions, puz.LazyExtensions)
+        assert len(p.extensions.pending()) == 3
+
+    # looking at the puzzle through its helpers doesn't count as a change
+    assert p.has_rebus()
+    assert p.has_markup()
+    assert p.tobytes() is data
+
+    # but a change to any field does, until it is reverted
+    fill = p.fill
+    p.fill = 'X' + fill[1:]
+    assert p.tobytes() != data
+    assert puz.load(p.tobytes()).fill == p.fill
+    p.fill = fill
+    assert p.tobytes() == data
+
+    p.clues[0] = 'A new clue'
+    assert puz.load(p.tobytes()).clues[0] == 'A new clue'
+
+    # and to the extensions
+    p = puz.load(data, lazy=lazy)
+    p.markup().markup[0] = puz.GridMarkup.Circled
+    assert p.tobytes() != data
+    assert p.markup().markup[0] == puz.load(p.tobytes()).markup().markup[0]
+
+    p = puz.load(data, lazy=lazy)
+    del p.extensions[puz.Extensions.Markup]
+    assert not puz.load(p.tobytes()).has_markup()
+
+    # a puzzle loaded from a buffer other than bytes doesn't hold on to it
+    p = puz.load(bytearray(data))
+    assert p.tobytes() == data
+
+
 def test_extension_checksum_error() -> None:
     data = bytearray(puz.read('testfiles/nyt_rebus_with_notes_and_shape.puz').tobytes())
     pos = data.index(b'GRBS')
@@ -322,6 +831,65 @@ def test_junk_at_end_of_puzzle() -> None:
     assert p.postscript == b'\r\n\r\n'
 
 
+def test_readonly_puzzle_buffer() -> None:
+    s = puz.PuzzleBuffer(b'ab\0cd\0\x01\x00', readonly=True)
+    assert isinstance(s.data, memoryview)
+    assert s.read_string() == 'ab'
+    assert s.read_decoded(2) == 'cd'
+    s.skip(1)
+    assert s.unpack('<H') == (1,)
+    assert not s.can_read()
+    with pytest.raises(TypeError, match='read-only'):
+        s.write(b'x')
+    with pytest.raises(TypeError, match='read-only'):
+        s.write_string('x')
+    s.release()
+
+
+def test_read_strings() -> None:
+    s = puz.PuzzleBuffer('title\0\0clue 1\0⚔️\0rest'.encode(), encoding=puz.ENCODING_UTF8, readonly=True)
+    assert s.read_strings(0) == []
+    assert s.read_strings(4) == ['title', '', 'clue 1', '⚔️']
+    assert s.read_to_end() == b'rest'
+
+    s = puz.PuzzleBuffer(b'title\0clue 1\0clue 2')
+    with pytest.raises(puz.PuzzleFormatError, match='found 2 of 3 strings'):
+        s.read_strings(3)
+
+
+def test_truncated_string_table() -> None:
+    with open('testfiles/washpost.puz', 'rb') as fp:
+        data = fp.read()
+    p = puz.load(data)
+    # cut the file off in the middle of the last clue
+    last_clue = p.encode(p.clues[-1])
+    end = data.index(last_clue + b'\0' + p.encode(p.notes)) + len(last_clue)
+    with pytest.raises(puz.PuzzleFormatError, match='string table is truncated'):
+        puz.load(data[:end])
+
+
+def test_load_does_not_copy_input() -> None:
+    import tracemalloc
+    with open('testfiles/washpost.puz', 'rb') as fp:
+        orig = fp.read()
+    # a large junk preamble would previously be copied twice during load
+    data = b'\0' * 1_000_000 + orig
+
+    tracemalloc.start()
+    try:
+        p = puz.load(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the preamble itself is kept for round-tripping, but nothing else of that size
+    assert peak < 1.5 * len(data)
+    assert p.tobytes() == data
+
+    # bytearray and memoryview inputs work too
+    assert puz.load(bytearray(orig)).tobytes() == orig
+    assert puz.load(memoryview(orig)).tobytes() == orig
+
+
 def test_v1_4() -> None:
     p = puz.read('testfiles/nyt_v1_4.puz')
     assert p.version_tuple() == (1, 4)
@@ -498,6 +1066,63 @@ def test_unlock_relock() -> None:
     assert orig == new, 'nyt_locked.puz did not round-trip'
 
 
+@pytest.mark.parametrize('workers', [1, 2])
+def test_find_key(workers: int) -> None:
+    p = puz.read('testfiles/nyt_locked.puz')
+    found = puz.find_key(p, workers=workers)
+    assert found is not None
+    key, solution = found
+    assert key == 7844
+    assert p.is_solution_locked()
+    assert p.unlock_solution(key)
+    assert solution == p.solution
+
+    assert puz.find_key(puz.read('testfiles/nyt_locked.puz'), workers=workers, keys=range(1000, 7844)) is None
+
+
+def test_find_key_errors() -> None:
+    with pytest.raises(ValueError, match='not locked'):
+        puz.find_key(puz.read('testfiles/washpost.puz'))
+
+    p = _make_puzzle()
+    p.solution = 'ABCDEFGH1'
+    p.solution_state = puz.SolutionState.Locked
+    with pytest.raises(ValueError, match='A-Z'):
+        puz.find_key(p)
+
+
+def test_unscramble_bytes_matches_unscramble_string() -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        s = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randrange(40)))
+        key = rng.randrange(10000)
+        assert puz._unscramble_bytes(s.encode(), key).decode() == puz.unscramble_string(s, key)
+
+
+def test_scramble_plans_match_scramble_string() -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        w, h = rng.randint(1, 8), rng.randint(1, 8)
+        solution = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ..') for _ in range(w * h))
+        key = rng.randrange(10000)
+
+        # scrambling works on the non-black letters in column-major order
+        sq = puz.square(solution, w, h)
+        scrambled = puz.square(puz.restore(sq, puz.scramble_string(puz.replace_chars(sq, '.'), key)), h, w)
+        assert puz.scramble_solution(solution, w, h, key) == scrambled
+
+        sq = puz.square(scrambled, w, h)
+        unscrambled = puz.square(puz.restore(sq, puz.unscramble_string(puz.replace_chars(sq, '.'), key)), h, w)
+        assert puz.unscramble_solution(scrambled, w, h, key) == unscrambled
+
+        assert puz.scrambled_cksum(scrambled, w, h) == puz.data_cksum(puz.replace_chars(sq, '.').encode())
+
+    with pytest.raises(ValueError, match='A-Z'):
+        puz.scramble_solution('ABC.d', 5, 1, 1234)
+    with pytest.raises(ValueError, match='A-Z'):
+        puz.shift('ABc', [1, 2, 3, 4])
+
+
 def test_check_answers_locked() -> None:
     p1 = puz.read('testfiles/nyt_locked.puz')
     p2 = puz.read('testfiles/nyt_locked.puz')
@@ -506,6 +1131,48 @@ def test_check_answers_locked() -> None:
     assert p2.check_answers(p1.solution)
 
 
+def test_locked_checker() -> None:
+    p = puz.read('testfiles/nyt_locked.puz')
+    solution = puz.read('testfiles/nyt_locked.puz').solution
+    solution = puz.unscramble_solution(solution, p.width, p.height, 7844)
+
+    checker = p.locked_checker()
+    assert checker.fill == p.fill
+    cells = [i for i, c in enumerate(solution) if c != '.']
+    for i in cells:
+        assert not checker.is_correct()
+        checker.set_cell(i, solution[i])
+    assert checker.is_correct()
+    assert checker.fill == solution
+
+    checker.set_cell(cells[10], 'Z' if solution[cells[10]] != 'Z' else 'Y')
+    assert not checker.is_correct()
+
+    with pytest.raises(ValueError, match='black square'):
+        checker.set_cell(solution.index('.'), 'A')
+    fill = checker.fill
+    for ch in ('AB', ''):
+        with pytest.raises(ValueError, match='single character'):
+            checker.set_cell(0, ch)
+    assert checker.fill == fill
+    with pytest.raises(ValueError, match='not locked'):
+        puz.read('testfiles/washpost.puz').locked_checker()
+
+
+def test_locked_checker_matches_check_answers() -> None:
+    p = puz.read('testfiles/nyt_locked.puz')
+    p.encoding = puz.ENCODING_UTF8
+    checker = p.locked_checker()
+    cells = [i for i, c in enumerate(p.fill) if c != '.']
+    rng = random.Random(0)
+    for _ in range(100):
+        # including characters that take more than one byte
+        checker.set_cell(rng.choice(cells), rng.choice('ABCÉ€-'))
+        fill = checker.fill
+        assert checker._states[-1] & 0xffff == puz.scrambled_cksum(fill, p.width, p.height, encoding=p.encoding)
+        assert checker.is_correct() == p.check_answers(fill)
+
+
 def test_check_answers_strict() -> None:
     p = _make_puzzle()  # solution = 'ABCDEFGHI', fill = '---------'
     partial_fill = 'ABC------'   # first row correct, rest blank
@@ -952,6 +1619,290 @@ def test_bad_puzfile_raises_puzzle_format_error(filename: str) -> None:
         puz.read(filename)
 
 
+@pytest.mark.parametrize('filename', _not_bad(glob.glob('testfiles/*.puz')))
+def test_read_mmap(filename: str) -> None:
+    with open(filename, 'rb') as fp:
+        orig = fp.read()
+    p = puz.read_mmap(filename)
+    assert p.tobytes() == orig
+    assert p.clues == puz.read(filename).clues
+
+
+@pytest.mark.parametrize('filename', _not_bad(glob.glob('testfiles/*.puz')))
+def test_read_header(filename: str) -> None:
+    p = puz.read(filename)
+    header = puz.read_header(filename)
+    assert isinstance(header, puz.PuzzleHeader)
+    assert header.title == p.title
+    assert header.author == p.author
+    assert header.copyright == p.copyright
+    assert (header.width, header.height) == (p.width, p.height)
+    assert header.version == p.version
+    assert header.puzzletype == p.puzzletype
+    assert header.solution_state == p.solution_state
+    assert header.numclues == len(p.clues)
+    assert puz.read_header(p.tobytes()) == header
+
+    # any buffer that load() accepts
+    data = p.tobytes()
+    assert puz.read_header(bytearray(data)) == header
+    assert puz.read_header(memoryview(data)) == header
+    with open(filename, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+        assert puz.read_header(mapping) == header
+
+
+def test_read_header_errors() -> None:
+    with pytest.raises(puz.PuzzleFormatError):
+        puz.read_header(b'not a puzzle')
+
+    with open('testfiles/washpost.puz', 'rb') as fp:
+        data = fp.read()
+    base = data.index(puz.ACROSSDOWN) - 2
+
+    # corrupt stored header checksum
+    bad = bytearray(data)
+    bad[base + 14] ^= 0xFF
+    with pytest.raises(puz.PuzzleFormatError, match='header'):
+        puz.read_header(bytes(bad))
+
+    # header intact but the rest of the file is missing
+    with pytest.raises(puz.PuzzleFormatError, match='truncated'):
+        puz.read_header(data[:base + 60])
+
+    # cut off inside the title: as much an error as it is for a full load
+    p = puz.load(data)
+    title = data.index(p.encode(p.title), base + 52)
+    for truncated in (data[:title + 2], data[:title + len(p.title) + 1]):
+        with pytest.raises(puz.PuzzleFormatError, match='string table is truncated'):
+            puz.load(truncated)
+        with pytest.raises(puz.PuzzleFormatError, match='string table is truncated'):
+            puz.read_header(truncated)
+
+
+@pytest.mark.parametrize('filename', _not_bad(glob.glob('testfiles/*.puz')))
+def test_lazy_extensions_roundtrip(filename: str) -> None:
+    with open(filename, 'rb') as fp:
+        orig = fp.read()
+    p = puz.read(filename, lazy=True)
+    assert isinstance(p.extensions, puz.LazyExtensions)
+    assert p.extensions.pending() == list(p.extensions)
+    assert p.tobytes() == orig
+
+    # the helpers see the same data as an eagerly loaded puzzle
+    p = puz.load(orig, lazy=True)
+    assert isinstance(p.extensions, puz.LazyExtensions)
+    eager = puz.load(orig)
+    assert p.has_rebus() == eager.has_rebus()
+    assert p.has_markup() == eager.has_markup()
+    assert dict(p.extensions) == dict(eager.extensions)
+    assert p.extensions.pending() == []
+
+
+def test_lazy_extensions_checksum_deferred() -> None:
+    data = bytearray(puz.read('testfiles/nyt_rebus_with_notes_and_shape.puz').tobytes())
+    pos = data.index(b'GRBS')
+    data[pos + 6] ^= 0xFF  # flip a byte in the GRBS extension checksum
+
+    # the bad checksum only surfaces once the extension is accessed
+    p = puz.load(data, lazy=True)
+    assert isinstance(p.extensions, puz.LazyExtensions)
+    assert puz.Extensions.Rebus in p.extensions
+    assert p.extensions[puz.Extensions.Markup]
+    assert p.extensions.pending() == [puz.Extensions.Rebus, puz.Extensions.RebusSolutions]
+    with pytest.raises(puz.PuzzleFormatError, match='extension'):
+        p.rebus()
+
+    # replacing the payload means it is never verified
+    p.extensions[puz.Extensions.Rebus] = b'\0' * (p.width * p.height)
+    assert p.rebus().get_rebus_squares() == []
+    assert puz.load(p.tobytes()).extensions[puz.Extensions.Rebus] == b'\0' * (p.width * p.height)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_load_many(workers: int) -> None:
+    filenames = sorted(glob.glob('testfiles/*.puz'))
+    results = list(puz.load_many(filenames, workers=workers, chunksize=3))
+    assert [filename for filename, _ in results] == filenames
+    for filename, result in results:
+        if filename.endswith('_bad.puz'):
+            assert isinstance(result, puz.PuzzleFormatError)
+        else:
+            assert isinstance(result, puz.Puzzle)
+            with open(filename, 'rb') as fp:
+                assert result.tobytes() == fp.read()
+
+
+def test_load_many_unordered() -> None:
+    filenames = sorted(glob.glob('testfiles/*.puz'))
+    results = dict(puz.load_many(filenames, workers=2, chunksize=2, ordered=False))
+    assert sorted(results) == filenames
+    assert isinstance(results['testfiles/washpost.puz'], puz.Puzzle)
+    assert isinstance(results['testfiles/ONE_bad.puz'], puz.PuzzleFormatError)
+
+    # errors other than format errors are not swallowed
+    with pytest.raises(FileNotFoundError):
+        list(puz.load_many(['testfiles/does_not_exist.puz'], workers=1))
+
+
+def test_load_many_stops_early(monkeypatch: pytest.MonkeyPatch) -> None:
+    import concurrent.futures
+
+    calls: list[dict[str, Any]] = []
+    shutdown = concurrent.futures.ProcessPoolExecutor.shutdown
+
+    def recording_shutdown(self: concurrent.futures.ProcessPoolExecutor, *args: Any, **kwargs: Any) -> None:
+        calls.append(kwargs)
+        shutdown(self, *args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures.ProcessPoolExecutor, 'shutdown', recording_shutdown)
+    filenames = sorted(glob.glob('testfiles/*.puz')) * 10
+    for ordered in (True, False):
+        calls.clear()
+        for _ in puz.load_many(filenames, workers=2, chunksize=1, ordered=ordered):
+            break
+        # the files that were still queued are cancelled rather than read
+        assert calls[0] == {'cancel_futures': True}
+
+
+def test_aread_asave(tmp_path: pathlib.Path) -> None:
+    import asyncio
+
+    async def roundtrip() -> puz.Puzzle:
+        p = await puz.aread('testfiles/washpost.puz')
+        p.fill = 'LAMB' + p.fill[4:]
+        await p.asave(str(tmp_path / 'out.puz'), atomic=True)
+        return await puz.aread(str(tmp_path / 'out.puz'))
+
+    p = asyncio.run(roundtrip())
+    assert p.fill.startswith('LAMB')
+
+    with pytest.raises(puz.PuzzleFormatError):
+        asyncio.run(puz.aread('testfiles/ONE_bad.puz'))
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_aread_many(ordered: bool) -> None:
+    import asyncio
+    import concurrent.futures
+
+    filenames = sorted(glob.glob('testfiles/*.puz'))
+
+    async def read_all() -> list[tuple[str, object]]:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            return [r async for r in puz.aread_many(filenames, limit=3, ordered=ordered, executor=executor)]
+
+    results = asyncio.run(read_all())
+    if ordered:
+        assert [filename for filename, _ in results] == filenames
+    assert sorted(filename for filename, _ in results) == filenames
+    for filename, result in results:
+        assert isinstance(result, puz.PuzzleFormatError if filename.endswith('_bad.puz') else puz.Puzzle)
+
+    async def read_none() -> None:
+        async for _ in puz.aread_many(filenames, limit=0):
+            pass
+
+    with pytest.raises(ValueError, match='limit must be at least 1'):
+        asyncio.run(read_none())
+
+
+def test_read_mmap_errors(tmp_path: pathlib.Path) -> None:
+    empty = tmp_path / 'empty.puz'
+    empty.write_bytes(b'')
+    with pytest.raises(puz.PuzzleFormatError):
+        puz.read_mmap(str(empty))
+    with pytest.raises(puz.PuzzleFormatError):
+        puz.read_mmap('testfiles/ONE_bad.puz')
+
+
+def test_write_to_file_object() -> None:
+    p = puz.read('testfiles/nyt_rebus_with_notes_and_shape.puz')
+    f = io.BytesIO()
+    p.write(f)
+    assert f.getvalue() == p.tobytes()
+
+
+@pytest.mark.parametrize('fsync', [False, True])
+def test_atomic_save(tmp_path: pathlib.Path, fsync: bool) -> None:
+    p = puz.read('testfiles/washpost.puz')
+    filename = str(tmp_path / 'out.puz')
+    p.save(filename, atomic=True, fsync=fsync)
+    assert pathlib.Path(filename).read_bytes() == p.tobytes()
+
+    # overwriting an existing file
+    p.fill = 'LAMB' + p.fill[4:]
+    p.save(filename, atomic=True, fsync=fsync)
+    assert puz.read(filename).fill == p.fill
+    assert os.listdir(tmp_path) == ['out.puz']
+
+
+def test_patch(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    p = puz.read('testfiles/nyt_partlyfilled.puz')
+    filename = str(tmp_path / 'out.puz')
+    p.save(filename)
+
+    writes: list[bytes] = []
+
+    class RecordingFile(io.FileIO):
+        def write(self, data: Any) -> int:
+            writes.append(bytes(data))
+            return super().write(data)
+
+    monkeypatch.setattr(puz, 'open', RecordingFile, raising=False)
+
+    # a same-size change only rewrites the sections that differ: the header and fill
+    p.fill = 'A' + p.fill[1:]
+    assert p.patch(filename)
+    assert pathlib.Path(filename).read_bytes() == p.tobytes()
+    assert len(writes) == 2
+    assert p.encode(p.fill) in writes
+
+    # nothing changed, nothing written
+    writes.clear()
+    assert p.patch(filename)
+    assert writes == []
+
+    # a timer extension of a different length means an atomic save over the file
+    replaced: list[str] = []
+    replace = os.replace
+
+    def recording_replace(src: str, dst: str) -> None:
+        replaced.append(dst)
+        replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', recording_replace)
+    t = p.timer()
+    t.elapsed_seconds = 12345
+    assert not p.patch(filename)
+    assert replaced == [filename]
+    assert puz.read(filename).timer().elapsed_seconds == 12345
+    assert pathlib.Path(filename).read_bytes() == p.tobytes()
+
+    # and the file also shrinks back
+    t.elapsed_seconds = 1
+    assert not p.patch(filename, fsync=True)
+    assert pathlib.Path(filename).read_bytes() == p.tobytes()
+
+
+def test_atomic_save_failure_keeps_original(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    p = puz.read('testfiles/washpost.puz')
+    filename = str(tmp_path / 'out.puz')
+    p.save(filename)
+    original = pathlib.Path(filename).read_bytes()
+
+    def failing_replace(src: str, dst: str) -> None:
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    p.fill = 'LAMB' + p.fill[4:]
+    with pytest.raises(OSError, match='disk full'):
+        p.save(filename, atomic=True)
+
+    # the original is untouched and the temporary file is cleaned up
+    assert pathlib.Path(filename).read_bytes() == original
+    assert os.listdir(tmp_path) == ['out.puz']
+
+
 def test_timer_running() -> None:
     p = puz.read('testfiles/nyt_partlyfilled.puz')
     assert p.has_timer()